@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Compara a expansão vetorizada de expressões cron (cron_date_array) com a iteração pelo
+croniter, validando que os resultados são iguais e medindo o tempo de cada uma.
+
+Uso: python -m benchmarks.cron_date_array
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from pipelines.common import constants
+from pipelines.common.utils.utils import (
+    _cron_date_range_iterator,
+    _cron_expand,
+    cron_date_array,
+)
+
+CRON_EXPRESSIONS = [
+    "* * * * *",
+    "*/5 * * * *",
+    "0 * * * *",
+    "0 0 * * *",
+    "0 0 1,15 * *",
+    "0 0 * * MON-FRI",
+    "0 0 1 * 1",
+    "30 10 * JUL,SEP *",
+    "0 0 * * 1#2",
+    "0 0 L * *",
+]
+
+
+def _iterator_array(cron_expr: str, start_time: datetime, end_time: datetime) -> np.ndarray:
+    """
+    Gera o mesmo array de cron_date_array usando apenas o croniter.
+
+    Args:
+        cron_expr (str): Expressão cron
+        start_time (datetime): Datetime de início do range (exclusivo)
+        end_time (datetime): Datetime de fim do range (inclusivo)
+
+    Returns:
+        np.ndarray: array ordenado com o range de datetimes em UTC
+    """
+    return np.array(
+        [
+            int(d.timestamp())
+            for d in _cron_date_range_iterator(
+                cron_expr=cron_expr,
+                start_time=start_time,
+                end_time=end_time,
+            )
+        ],
+        dtype=np.int64,
+    ).astype("datetime64[s]")
+
+
+def _timeit(func, *args, repeat: int = 3) -> float:
+    """
+    Retorna o menor tempo, em segundos, entre as execuções de uma função.
+
+    Args:
+        func (Callable): Função medida
+        *args: Argumentos da função
+        repeat (int): Quantidade de execuções
+
+    Returns:
+        float: Menor tempo de execução
+    """
+    timings = []
+    for _ in range(repeat):
+        _cron_expand.cache_clear()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    tz = ZoneInfo(constants.TIMEZONE)
+    end_time = datetime(2026, 10, 1, tzinfo=tz)
+    start_time = end_time - timedelta(days=30)
+
+    failures = []
+    print(f"{'expressão':<22}{'execuções':>10}{'croniter (s)':>15}{'vetorizado (s)':>16}")
+    for cron_expr in CRON_EXPRESSIONS:
+        _cron_expand.cache_clear()
+        expected = _iterator_array(cron_expr, start_time, end_time)
+        result = cron_date_array(cron_expr, start_time, end_time)
+        if not np.array_equal(result, expected):
+            failures.append(cron_expr)
+
+        iterator_time = _timeit(_iterator_array, cron_expr, start_time, end_time)
+        vectorized_time = _timeit(cron_date_array, cron_expr, start_time, end_time)
+        print(f"{cron_expr:<22}{len(expected):>10}{iterator_time:>15.4f}{vectorized_time:>16.4f}")
+
+    if failures:
+        print(f"Resultados divergentes do croniter: {failures}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Compara transform_to_nested_structure com a serialização linha a linha usada anteriormente
+(DataFrame.apply + Series.to_json), validando que a coluna content é igual e medindo as
+linhas processadas por segundo.
+
+Uso: python -m benchmarks.transform_to_nested_structure
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipelines.common.utils.pretreatment import transform_to_nested_structure
+
+
+def _row_wise_nested_structure(data: pd.DataFrame, primary_keys: list) -> pd.DataFrame:
+    """
+    Implementação anterior de transform_to_nested_structure, serializando linha a linha.
+
+    Args:
+        data (pd.DataFrame): DataFrame para aplicar o tratamento
+        primary_keys (list): Lista de primary keys
+
+    Returns:
+        pd.DataFrame: Dataframe contendo as colunas listadas nas primary keys + coluna content
+    """
+    content_columns = [c for c in data.columns if c not in primary_keys]
+    data["content"] = data.apply(
+        lambda row: row[content_columns].to_json(),
+        axis=1,
+    )
+    return data[[*primary_keys, "content"]]
+
+
+def _gtfs_like_data(rows: int) -> pd.DataFrame:
+    """
+    Gera um DataFrame parecido com o stop_times do GTFS, apenas com strings.
+
+    Args:
+        rows (int): Quantidade de linhas
+
+    Returns:
+        pd.DataFrame: DataFrame gerado
+    """
+    rng = np.random.default_rng(0)
+    seconds = rng.integers(0, 86400, rows)
+    hours = pd.Series(seconds // 3600).astype(str).str.zfill(2)
+    minutes = pd.Series(seconds // 60 % 60).astype(str).str.zfill(2)
+    return pd.DataFrame(
+        {
+            "trip_id": [f"trip_{i // 40}" for i in range(rows)],
+            "stop_sequence": (np.arange(rows) % 40).astype(str),
+            "arrival_time": hours + ":" + minutes + ":00",
+            "departure_time": hours + ":" + minutes + ":30",
+            "stop_id": rng.integers(0, 10000, rows).astype(str),
+            "shape_dist_traveled": rng.random(rows).round(3).astype(str),
+        }
+    )
+
+
+def _jae_like_data(rows: int) -> pd.DataFrame:
+    """
+    Gera um DataFrame parecido com as transações da Jaé, com dtypes variados.
+
+    Args:
+        rows (int): Quantidade de linhas
+
+    Returns:
+        pd.DataFrame: DataFrame gerado
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "valor_transacao": rng.random(rows).round(2) * 10,
+            "data_transacao": pd.Timestamp("2026-10-01")
+            + pd.to_timedelta(rng.integers(0, 86400, rows), unit="s"),
+            "cd_linha": rng.integers(0, 1000, rows).astype(str),
+            "id_tipo_modal": rng.integers(1, 6, rows),
+            "tipo_gratuidade": rng.choice(["Estudante", "Idoso", None], rows),
+            "validador_online": rng.integers(0, 2, rows).astype(bool),
+        }
+    )
+
+
+def _numeric_data(rows: int) -> pd.DataFrame:
+    """
+    Gera um DataFrame apenas numérico, em que a linha é convertida para float.
+
+    Args:
+        rows (int): Quantidade de linhas
+
+    Returns:
+        pd.DataFrame: DataFrame gerado
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "latitude": rng.random(rows) - 22.9,
+            "longitude": rng.random(rows) - 43.2,
+            "velocidade": rng.integers(0, 80, rows),
+        }
+    )
+
+
+DATASETS = {
+    "gtfs_stop_times": (_gtfs_like_data, ["trip_id", "stop_sequence"], 100_000),
+    "jae_transacao": (_jae_like_data, ["id"], 50_000),
+    "numerico": (_numeric_data, ["id"], 50_000),
+}
+
+
+def main() -> int:
+    failures = []
+    print(f"{'dados':<18}{'linhas':>9}{'linha a linha (l/s)':>22}{'vetorizado (l/s)':>19}")
+    for name, (generate, primary_keys, rows) in DATASETS.items():
+        data = generate(rows)
+
+        start = time.perf_counter()
+        expected = _row_wise_nested_structure(data.copy(), primary_keys)
+        row_wise_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = transform_to_nested_structure(data.copy(), primary_keys)
+        vectorized_time = time.perf_counter() - start
+
+        if not result.equals(expected):
+            failures.append(name)
+
+        print(f"{name:<18}{rows:>9}{rows / row_wise_time:>22,.0f}{rows / vectorized_time:>19,.0f}")
+
+    if failures:
+        print(f"Resultados divergentes da serialização linha a linha: {failures}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@
 """
 Flow de captura de dados de GPS realocacao da Conecta
 
-Common: 2026-03-18
+Common: 2026-10-18
 """
 
 from typing import Optional
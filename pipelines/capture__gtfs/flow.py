@@ -5,7 +5,7 @@ Flow de captura e tratamento de dados do GTFS
 Captura arquivos GTFS (Ordem de Serviço e tabelas padrão) do Google Drive,
 transforma em estrutura aninhada e materializa via dbt.
 
-Common: 2026-05-15
+Common: 2026-10-18
 """
 
 from typing import Optional
@@ -271,6 +271,8 @@ def upload_raw_data_to_gcs(
         mode="raw",
         filepath=raw_filepath,
         partition=partitions,
+        skip_if_identical=True,
+        composite_threshold=smtr_constants.GCS_COMPOSITE_UPLOAD_THRESHOLD,
     )
 
 
@@ -286,6 +288,7 @@ def upload_staging_data_to_gcs(
         mode="staging",
         filepath=staging_filepath,
         partition=partitions,
+        composite_threshold=smtr_constants.GCS_COMPOSITE_UPLOAD_THRESHOLD,
     )
 
     if not tb_obj.exists():
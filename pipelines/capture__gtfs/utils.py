@@ -12,7 +12,7 @@ import openpyxl as xl
 import pandas as pd
 import requests
 from google.auth import default
-from google.cloud import bigquery, storage
+from google.cloud import bigquery
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
@@ -20,6 +20,7 @@ from unidecode import unidecode
 
 from pipelines.capture__gtfs import constants
 from pipelines.common import constants as smtr_constants
+from pipelines.common.utils.gcp.base import get_gcp_client
 from pipelines.common.utils.gcp.bigquery import BQTable, Dataset
 from pipelines.common.utils.utils import is_running_locally
 
@@ -47,7 +48,7 @@ def get_google_api_service(service_name: str, version: str, scopes=None):
 
 def get_upload_storage_blob(env: str, dataset_id: str, filename: str):
     """Retorna um blob da zona de upload do GCS."""
-    client = storage.Client()
+    client = get_gcp_client(service="storage", project=smtr_constants.PROJECT_NAME[env])
     bucket_name = smtr_constants.DEFAULT_BUCKET_NAME[env]
     bucket = client.bucket(bucket_name)
     blobs = list(bucket.list_blobs(prefix=f"upload/{dataset_id}/{filename}."))
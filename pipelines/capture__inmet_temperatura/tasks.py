@@ -9,7 +9,7 @@ from prefect.cache_policies import NO_CACHE
 
 from pipelines.capture__inmet_temperatura import constants
 from pipelines.common.capture.default_capture.utils import SourceCaptureContext
-from pipelines.common.utils.extractors.api import get_raw_api_list
+from pipelines.common.utils.extractors.api import get_raw_api_list_concurrent
 from pipelines.common.utils.secret import get_env_secret
 
 
@@ -28,4 +28,4 @@ def create_temperatura_extractor(context: SourceCaptureContext):
         url = f"{constants.INMET_BASE_URL}/{data_inicio}/{data_fim}/{estacao}/{key}"
         url_list.append(url)
 
-    return partial(get_raw_api_list, url=url_list, raw_filepath=context.raw_filepath)
+    return partial(get_raw_api_list_concurrent, url=url_list, raw_filepath=context.raw_filepath)
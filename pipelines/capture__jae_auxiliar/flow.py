@@ -4,16 +4,19 @@ Flow de captura de dados auxiliares da Jaé
 
 Executa a captura de dados da tabela auxiliar do sistema Jaé.
 
-Common: 2026-05-20
+Common: 2026-10-18
 """
 
 from typing import Optional
 
+from prefect.task_runners import ProcessPoolTaskRunner
+
 from pipelines.capture__jae_auxiliar import constants
 from pipelines.common.capture.default_capture.flow import (
     create_capture_flows_default_tasks,
 )
 from pipelines.common.capture.default_capture.utils import rename_capture_flow_run
+from pipelines.common.capture.jae import constants as jae_constants
 from pipelines.common.capture.jae.tasks import create_jae_general_extractor
 from pipelines.common.utils.prefect import flow
 
@@ -38,4 +41,6 @@ def capture__jae_auxiliar(  # noqa: PLR0913
         recapture=recapture,
         recapture_days=recapture_days,
         recapture_timestamps=recapture_timestamps,
+        max_contexts_in_flight=jae_constants.JAE_MAX_CONTEXTS_IN_FLIGHT,
+        pretreat_task_runner=ProcessPoolTaskRunner(),
     )
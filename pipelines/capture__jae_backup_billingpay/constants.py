@@ -135,6 +135,7 @@ BACKUP_JAE_BILLING_PAY = {
             """,
         },
         "page_size": {"CLIENTE_IMAGEM": 500},
+        "pagination_key": {"CLIENTE_IMAGEM": "ID_CLIENTE_IMAGEM"},
     },
     "tarifa_db": {
         "exclude": ["linha_tarifa"],
@@ -2,7 +2,7 @@
 """
 Flow para backup incremental de dados BillingPay da Jaé
 
-Common: 2026-05-12
+Common: 2026-10-18
 """
 
 from typing import Optional
@@ -8,13 +8,14 @@ import pandas as pd
 from prefect import task
 from prefect.cache_policies import NO_CACHE
 from pytz import timezone
-from sqlalchemy import DATE, DATETIME, TIMESTAMP, create_engine, inspect
+from sqlalchemy import DATE, DATETIME, TIMESTAMP, inspect
 
 from pipelines.capture__jae_backup_billingpay import constants
 from pipelines.capture__jae_backup_billingpay.utils import (
     create_billingpay_backup_filepath,
     get_redis_last_backup,
 )
+from pipelines.common import constants as smtr_constants
 from pipelines.common.capture.jae import constants as jae_constants
 from pipelines.common.capture.jae.utils import get_jae_database_settings
 from pipelines.common.treatment.default_treatment import (
@@ -22,6 +23,7 @@ from pipelines.common.treatment.default_treatment import (
 )
 from pipelines.common.utils.database import (
     create_database_url,
+    get_engine,
     list_accessible_tables,
 )
 from pipelines.common.utils.extractors.db import get_db_data, get_raw_db_paginated
@@ -80,7 +82,7 @@ def get_table_info(
             - partição do arquivo
     """
     database_url = create_database_url(**database_config)
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     inspector = inspect(engine)
     tables_config = constants.BACKUP_JAE_BILLING_PAY[database_name]
     partition = create_partition(timestamp=timestamp, partition_date_only=True)
@@ -213,7 +215,7 @@ def get_non_filtered_tables(
     if len(no_filter_tables) == 0:
         return False, []
     database_url = create_database_url(**database_config)
-    engine = create_engine(database_url)
+    engine = get_engine(database_url)
     result = []
     with engine.connect() as conn:
         for table in no_filter_tables:
@@ -318,12 +320,12 @@ def get_raw_backup_billingpay(
             table["redis_save_value"] = max_id
         sql = sql.format(filter=where)
 
+        database_constants = constants.BACKUP_JAE_BILLING_PAY[database_config["database"]]
         filepath = get_raw_db_paginated(
             query=sql,
             raw_filepath=table["filepath"],
-            page_size=constants.BACKUP_JAE_BILLING_PAY[database_config["database"]]
-            .get("page_size", {})
-            .get(table_name, 200_000),
+            page_size=database_constants.get("page_size", {}).get(table_name, 200_000),
+            pagination_key=database_constants.get("pagination_key", {}).get(table_name),
             **database_config,
         )
         table["filepath"] = filepath
@@ -347,12 +349,12 @@ def upload_backup_billingpay(
         list[dict]: Lista de dicionários com informações das tabelas
     """
     for table in table_info:
-        for filepath in table["filepath"]:
-            Storage(env=env, dataset_id=database_name, table_id=table["table_name"]).upload_file(
-                mode=constants.BACKUP_BILLING_PAY_FOLDER,
-                filepath=filepath,
-                partition=table["partition"],
-            )
+        Storage(env=env, dataset_id=database_name, table_id=table["table_name"]).upload_files(
+            mode=constants.BACKUP_BILLING_PAY_FOLDER,
+            filepaths=table["filepath"],
+            partition=table["partition"],
+            composite_threshold=smtr_constants.GCS_COMPOSITE_UPLOAD_THRESHOLD,
+        )
 
     return table_info
 
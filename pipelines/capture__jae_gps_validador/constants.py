@@ -16,4 +16,5 @@ GPS_VALIDADOR_SOURCE = SourceTable(
     first_timestamp=datetime(2025, 3, 26, 15, 30, 0, tzinfo=ZoneInfo(smtr_constants.TIMEZONE)),
     flow_folder_name="capture__jae_gps_validador",
     primary_keys=["id"],
+    max_coalesced_timestamps=jae_constants.JAE_MAX_COALESCED_TIMESTAMPS,
 )
@@ -18,4 +18,5 @@ INTEGRACAO_SOURCE = SourceTable(
     primary_keys=["id"],
     max_recaptures=2,
     file_chunk_size=20000,
+    pagination_key="id",
 )
@@ -27,6 +27,7 @@ JAE_ORDEM_PAGAMENTO_SOURCES = [
         max_recaptures=v.get("max_recaptures", 4),
         raw_filetype=v.get("raw_filetype", "json"),
         file_chunk_size=v.get("file_chunk_size"),
+        pagination_key=v.get("pagination_key"),
     )
     for k, v in jae_constants.JAE_TABLE_CAPTURE_PARAMS.items()
     if v.get("capture_flow") == "ordem_pagamento"
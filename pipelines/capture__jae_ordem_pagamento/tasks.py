@@ -56,6 +56,9 @@ def create_ressarcimento_db_extractor(context: SourceCaptureContext):
     }
     if context.source.file_chunk_size is not None:
         return partial(
-            get_raw_db_paginated, page_size=context.source.file_chunk_size, **general_func_arguments
+            get_raw_db_paginated,
+            page_size=context.source.file_chunk_size,
+            pagination_key=context.source.pagination_key,
+            **general_func_arguments,
         )
     return partial(get_raw_db, **general_func_arguments)
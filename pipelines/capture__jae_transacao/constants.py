@@ -16,4 +16,6 @@ TRANSACAO_SOURCE = SourceTable(
     first_timestamp=datetime(2025, 3, 21, 0, 0, 0, tzinfo=ZoneInfo(smtr_constants.TIMEZONE)),
     flow_folder_name="capture__jae_transacao",
     primary_keys=["id"],
+    max_coalesced_timestamps=jae_constants.JAE_MAX_COALESCED_TIMESTAMPS,
+    pretreatment_batch_size=50_000,
 )
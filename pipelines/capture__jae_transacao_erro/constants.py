@@ -18,4 +18,5 @@ JAE_TRANSACAO_ERRO_SOURCE = SourceTable(
     primary_keys=["id_transacao_recebida"],
     bucket_names=jae_constants.JAE_PRIVATE_BUCKET_NAMES,
     max_recaptures=60,
+    max_coalesced_timestamps=jae_constants.JAE_MAX_COALESCED_TIMESTAMPS,
 )
@@ -16,4 +16,5 @@ TRANSACAO_RIOCARD_SOURCE = SourceTable(
     first_timestamp=datetime(2025, 3, 21, 0, 0, 0, tzinfo=ZoneInfo(smtr_constants.TIMEZONE)),
     flow_folder_name="capture__jae_transacao_riocard",
     primary_keys=["id"],
+    max_coalesced_timestamps=jae_constants.JAE_MAX_COALESCED_TIMESTAMPS,
 )
@@ -12,6 +12,9 @@ RDO_SOURCE_NAME = "rioonibus"
 
 RDO_FTPS_SECRET_PATH = "smtr_rdo_ftps"
 
+RDO_FTP_MAX_CONCURRENT_DOWNLOADS = 3
+RDO_FTP_LISTING_CACHE_TTL_SECONDS = 6 * 60 * 60
+
 RDO_TABLE_CAPTURE_PARAMS = {
     "rdo_registros_sppo": {},
     # "rdo_registros_stpl": {},
@@ -1,10 +1,18 @@
 # -*- coding: utf-8 -*-
 """Funções de captura dos dados do RDO"""
 
+import re
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
 import pandas as pd
+from dateutil import parser
 
 from pipelines.capture__rioonibus_rdo_rho import constants
+from pipelines.common import constants as smtr_constants
 from pipelines.common.capture.default_capture.utils import SourceCaptureContext
+from pipelines.common.utils.extractors.ftp import get_raw_ftp
+from pipelines.common.utils.ftp import connect_ftp, list_ftp_directory
 
 
 def rename_rdo_columns(
@@ -17,3 +25,73 @@ def rename_rdo_columns(
     reindex_columns = constants.RDO_REINDEX_COLUMNS[transport_mode][report_type]
     data.columns = reindex_columns[: len(data.columns)]
     return data
+
+
+def get_raw_rdo_ftp(  # noqa: PLR0913
+    host: str,
+    port: int,
+    username: str,
+    password: str,
+    transport_mode: str,
+    report_type: str,
+    timestamp: datetime,
+    raw_filepath: str,
+    listing_redis_key: str,
+) -> list[str]:
+    """
+    Lista os arquivos do RDO/RHO de uma data no FTP e baixa os arquivos encontrados
+
+    A listagem e o download usam a mesma conexão. A listagem do diretório é salva no Redis
+    e reaproveitada enquanto a data de modificação do diretório não mudar.
+
+    Args:
+        host (str): Endereço do servidor FTP
+        port (int): Porta do servidor FTP
+        username (str): Usuário para autenticação
+        password (str): Senha para autenticação
+        transport_mode (str): Modo de transporte (diretório no FTP)
+        report_type (str): Tipo de relatório (RDO ou RHO)
+        timestamp (datetime): Timestamp da captura
+        raw_filepath (str): Template do caminho local com placeholder `{page}`
+        listing_redis_key (str): Chave do Redis da listagem do diretório
+
+    Returns:
+        list[str]: Lista com os caminhos dos arquivos salvos localmente
+    """
+    ftp_client = connect_ftp(host=host, port=port, username=username, password=password)
+    try:
+        files_info = list_ftp_directory(
+            ftp_client=ftp_client,
+            path=transport_mode,
+            redis_key=listing_redis_key,
+            cache_ttl_seconds=constants.RDO_FTP_LISTING_CACHE_TTL_SECONDS,
+        )
+        min_timestamp = datetime(2022, 1, 1, tzinfo=ZoneInfo(smtr_constants.TIMEZONE)).timestamp()
+
+        files = [
+            transport_mode + "/" + filename
+            for filename, info in files_info.items()
+            if datetime.timestamp(parser.parse(info["modify"])) >= min_timestamp
+            and "HISTORICO" not in filename
+            and filename[:3] == report_type
+            and re.findall("2\\d{3}\\d{2}\\d{2}", filename)[-1] == timestamp.strftime("%Y%m%d")
+        ]
+
+        assert len(files) > 0, (
+            f"Sem arquivos {report_type} {transport_mode} {timestamp.isoformat()}"
+        )
+
+        return get_raw_ftp(
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+            ftp_filepaths=files,
+            raw_filetype="csv",
+            raw_filepath=raw_filepath,
+            encoding="latin1",
+            max_concurrent_downloads=constants.RDO_FTP_MAX_CONCURRENT_DOWNLOADS,
+            ftp_client=ftp_client,
+        )
+    finally:
+        ftp_client.quit()
@@ -4,7 +4,7 @@ Flow de captura de dados de GPS registros do Sonda (BRT)
 
 Executa a captura dos dados de GPS do BRT via API Sonda.
 
-Common: 2026-04-30
+Common: 2026-10-18
 """
 
 from typing import Optional
@@ -1,16 +1,27 @@
 # -*- coding: utf-8 -*-
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any, Optional
 
 from prefect import runtime, unmapped
+from prefect.exceptions import UpstreamTaskError
+from prefect.futures import PrefectFuture, PrefectFutureList, as_completed, wait
+from prefect.task_runners import TaskRunner
 from prefect.tasks import Task
 
 from pipelines.common.capture.default_capture.tasks import (
     create_capture_contexts,
+    get_coalesced_raw_filepaths,
     get_raw_data,
     transform_raw_to_nested_structure,
     upload_raw_file_to_gcs,
     upload_source_data_to_gcs,
 )
+from pipelines.common.capture.default_capture.utils import (
+    FailedCaptureContextsError,
+    SourceCaptureContext,
+    group_capture_contexts,
+)
 from pipelines.common.tasks import (
     get_run_env,
     get_scheduled_timestamp,
@@ -20,6 +31,366 @@ from pipelines.common.tasks import (
 from pipelines.common.utils.gcp.bigquery import SourceTable
 
 
+@contextmanager
+def _start_task_runner(task_runner: Optional[TaskRunner]) -> Iterator[Optional[TaskRunner]]:
+    """
+    Inicia uma cópia do task runner informado, encerrando-o ao final do bloco.
+
+    Args:
+        task_runner (Optional[TaskRunner]): Task runner a ser iniciado.
+
+    Returns:
+        Iterator[Optional[TaskRunner]]: Task runner iniciado ou None.
+    """
+    if task_runner is None:
+        yield None
+        return
+
+    with task_runner.duplicate() as started_task_runner:
+        yield started_task_runner
+
+
+def _submit_task(
+    task: Task,
+    parameters: dict[str, Any],
+    wait_for: Optional[list] = None,
+    task_runner: Optional[TaskRunner] = None,
+) -> PrefectFuture:
+    """
+    Submete uma task no task runner informado ou no task runner do flow.
+
+    Task runners como o ProcessPoolTaskRunner apenas esperam as tasks do wait_for
+    terminarem, sem verificar se falharam. Por isso, a dependência de uma etapa anterior
+    deve ser passada como parâmetro da task, que não é executada se a etapa falhar.
+
+    Args:
+        task (Task): Task a ser submetida.
+        parameters (dict[str, Any]): Parâmetros da task.
+        wait_for (Optional[list]): Tasks que devem terminar antes da execução.
+        task_runner (Optional[TaskRunner]): Task runner já iniciado. Se None, usa o
+            task runner do flow.
+
+    Returns:
+        PrefectFuture: Future da task submetida.
+    """
+    if task_runner is None:
+        return task.submit(**parameters, wait_for=wait_for)
+
+    wait_for = [f for f in wait_for or [] if isinstance(f, PrefectFuture)]
+    return task_runner.submit(task, parameters=parameters, wait_for=wait_for)
+
+
+def _map_context_task(
+    task: Task,
+    contexts: list[SourceCaptureContext],
+    wait_for: Optional[list] = None,
+    task_runner: Optional[TaskRunner] = None,
+    **context_parameters: list,
+) -> PrefectFutureList:
+    """
+    Executa uma task para cada contexto, no task runner informado ou no task runner do flow.
+
+    Args:
+        task (Task): Task a ser executada.
+        contexts (list[SourceCaptureContext]): Contextos da captura.
+        wait_for (Optional[list]): Tasks que devem terminar antes da execução.
+        task_runner (Optional[TaskRunner]): Task runner já iniciado. Se None, usa o
+            task runner do flow.
+        **context_parameters (list): Parâmetros da task com um valor para cada contexto.
+
+    Returns:
+        PrefectFutureList: Futures das tasks, na mesma ordem dos contextos.
+    """
+    if task_runner is None:
+        return task.map(context=contexts, **context_parameters, wait_for=unmapped(wait_for))
+
+    return PrefectFutureList(
+        [
+            _submit_task(
+                task=task,
+                parameters={
+                    "context": context,
+                    **{key: value[index] for key, value in context_parameters.items()},
+                },
+                wait_for=wait_for,
+                task_runner=task_runner,
+            )
+            for index, context in enumerate(contexts)
+        ]
+    )
+
+
+def _run_staged_contexts(  # noqa: PLR0913
+    contexts: list[SourceCaptureContext],
+    create_extractor_task: Task,
+    tasks_wait_for: dict[str, list[Task]],
+    setup_environment_result: Any,
+    if_exists_upload: str,
+    pretreat_task_runner: Optional[TaskRunner],
+) -> dict[str, list]:
+    """
+    Executa as etapas da captura para todos os contextos, esperando todos os contextos
+    terminarem uma etapa antes de iniciar a próxima.
+
+    Args:
+        contexts (list[SourceCaptureContext]): Contextos da captura.
+        create_extractor_task (Task): Task utilizada para criar a função de extração.
+        tasks_wait_for (dict[str, list[Task]]): Mapeamento de tasks adicionais para o wait_for.
+        setup_environment_result (Any): Retorno da task de setup do ambiente.
+        if_exists_upload (str): Comportamento do upload caso o arquivo já exista no GCS.
+        pretreat_task_runner (Optional[TaskRunner]): Task runner já iniciado para a etapa de
+            pré-tratamento. Se None, usa o task runner do flow.
+
+    Returns:
+        dict[str, list]: Retorno de cada etapa, na mesma ordem dos contextos.
+    """
+    results = {"data_extractor": [], "get_raw": []}
+    groups = group_capture_contexts(contexts=contexts)
+    extraction_contexts = [group[-1] for group in groups]
+
+    data_extractor_future = create_extractor_task.map(
+        context=extraction_contexts,
+        wait_for=unmapped(tasks_wait_for.get("data_extractor")),
+    )
+
+    data_extractors = data_extractor_future.result()
+
+    get_raw_future = get_raw_data.map(
+        context=extraction_contexts,
+        data_extractor=data_extractors,
+        wait_for=unmapped(tasks_wait_for.get("get_raw")),
+    )
+
+    for group, data_extractor, raw_filepaths in zip(
+        groups, data_extractors, get_raw_future.result(), strict=True
+    ):
+        results["data_extractor"] += [data_extractor] * len(group)
+        if group[-1].coalesced_contexts:
+            results["get_raw"] += raw_filepaths
+        else:
+            results["get_raw"].append(raw_filepaths)
+
+    upload_raw_future = upload_raw_file_to_gcs.map(
+        context=contexts,
+        if_exists=unmapped(if_exists_upload),
+        raw_filepaths=results["get_raw"],
+        wait_for=unmapped(
+            [
+                results["get_raw"],
+                setup_environment_result,
+                *tasks_wait_for.get("upload_raw", []),
+            ]
+        ),
+    )
+
+    results["upload_raw"] = upload_raw_future.result()
+
+    pretreat_future = _map_context_task(
+        task=transform_raw_to_nested_structure,
+        contexts=contexts,
+        raw_filepaths=results["upload_raw"],
+        wait_for=tasks_wait_for.get("pretreat"),
+        task_runner=pretreat_task_runner,
+    )
+
+    results["pretreat"] = pretreat_future.result()
+
+    upload_source_future = upload_source_data_to_gcs.map(
+        context=contexts,
+        if_exists=unmapped(if_exists_upload),
+        wait_for=unmapped(
+            [
+                results["pretreat"],
+                setup_environment_result,
+                *tasks_wait_for.get("upload_source", []),
+            ]
+        ),
+    )
+
+    results["upload_source"] = upload_source_future.result()
+
+    return results
+
+
+def _submit_group_tasks(  # noqa: PLR0913
+    group: list[SourceCaptureContext],
+    create_extractor_task: Task,
+    tasks_wait_for: dict[str, list[Task]],
+    setup_environment_result: Any,
+    if_exists_upload: str,
+    pretreat_task_runner: Optional[TaskRunner],
+) -> list[dict[str, PrefectFuture]]:
+    """
+    Submete a cadeia de tasks de captura de um grupo de contextos. A extração é feita uma
+    vez pelo último contexto do grupo e as demais etapas são executadas para cada contexto,
+    esperando apenas pela etapa anterior do mesmo contexto.
+
+    Args:
+        group (list[SourceCaptureContext]): Contextos do grupo, criado por
+            group_capture_contexts.
+        create_extractor_task (Task): Task utilizada para criar a função de extração.
+        tasks_wait_for (dict[str, list[Task]]): Mapeamento de tasks adicionais para o wait_for.
+        setup_environment_result (Any): Retorno da task de setup do ambiente.
+        if_exists_upload (str): Comportamento do upload caso o arquivo já exista no GCS.
+        pretreat_task_runner (Optional[TaskRunner]): Task runner já iniciado para a etapa de
+            pré-tratamento. Se None, usa o task runner do flow.
+
+    Returns:
+        list[dict[str, PrefectFuture]]: Futures de cada etapa, na ordem de execução, para
+            cada contexto do grupo.
+    """
+    extraction_context = group[-1]
+
+    data_extractor_future = create_extractor_task.submit(
+        context=extraction_context,
+        wait_for=tasks_wait_for.get("data_extractor"),
+    )
+
+    get_raw_future = get_raw_data.submit(
+        context=extraction_context,
+        data_extractor=data_extractor_future,
+        wait_for=tasks_wait_for.get("get_raw"),
+    )
+
+    group_futures = []
+    for index, context in enumerate(group):
+        futures = {"data_extractor": data_extractor_future}
+
+        if extraction_context.coalesced_contexts:
+            futures["get_raw"] = get_coalesced_raw_filepaths.submit(
+                context=context,
+                coalesced_raw_filepaths=get_raw_future,
+                index=index,
+            )
+        else:
+            futures["get_raw"] = get_raw_future
+
+        futures["upload_raw"] = upload_raw_file_to_gcs.submit(
+            context=context,
+            if_exists=if_exists_upload,
+            raw_filepaths=futures["get_raw"],
+            wait_for=[
+                setup_environment_result,
+                *tasks_wait_for.get("upload_raw", []),
+            ],
+        )
+
+        futures["pretreat"] = _submit_task(
+            task=transform_raw_to_nested_structure,
+            parameters={"context": context, "raw_filepaths": futures["upload_raw"]},
+            wait_for=tasks_wait_for.get("pretreat"),
+            task_runner=pretreat_task_runner,
+        )
+
+        futures["upload_source"] = upload_source_data_to_gcs.submit(
+            context=context,
+            if_exists=if_exists_upload,
+            wait_for=[
+                futures["pretreat"],
+                setup_environment_result,
+                *tasks_wait_for.get("upload_source", []),
+            ],
+        )
+
+        group_futures.append(futures)
+
+    return group_futures
+
+
+def _run_pipelined_contexts(  # noqa: PLR0913
+    contexts: list[SourceCaptureContext],
+    max_contexts_in_flight: int,
+    create_extractor_task: Task,
+    tasks_wait_for: dict[str, list[Task]],
+    setup_environment_result: Any,
+    if_exists_upload: str,
+    pretreat_task_runner: Optional[TaskRunner],
+) -> list[dict[str, PrefectFuture]]:
+    """
+    Executa a captura de cada contexto de forma independente, mantendo no máximo
+    `max_contexts_in_flight` contextos em execução ao mesmo tempo.
+
+    Args:
+        contexts (list[SourceCaptureContext]): Contextos da captura.
+        max_contexts_in_flight (int): Número máximo de contextos executando simultaneamente.
+        create_extractor_task (Task): Task utilizada para criar a função de extração.
+        tasks_wait_for (dict[str, list[Task]]): Mapeamento de tasks adicionais para o wait_for.
+        setup_environment_result (Any): Retorno da task de setup do ambiente.
+        if_exists_upload (str): Comportamento do upload caso o arquivo já exista no GCS.
+        pretreat_task_runner (Optional[TaskRunner]): Task runner já iniciado para a etapa de
+            pré-tratamento. Se None, usa o task runner do flow.
+
+    Returns:
+        list[dict[str, PrefectFuture]]: Futures das etapas de cada contexto, na mesma ordem
+            dos contextos.
+    """
+    if max_contexts_in_flight <= 0:
+        raise ValueError("max_contexts_in_flight deve ser maior que zero")
+
+    context_futures = []
+    in_flight = []
+
+    for group in group_capture_contexts(contexts=contexts):
+        while in_flight and len(in_flight) + len(group) > max_contexts_in_flight:
+            finished = next(as_completed(in_flight))
+            in_flight.remove(finished)
+
+        group_futures = _submit_group_tasks(
+            group=group,
+            create_extractor_task=create_extractor_task,
+            tasks_wait_for=tasks_wait_for,
+            setup_environment_result=setup_environment_result,
+            if_exists_upload=if_exists_upload,
+            pretreat_task_runner=pretreat_task_runner,
+        )
+        context_futures += group_futures
+        in_flight += [futures["upload_source"] for futures in group_futures]
+
+    wait(in_flight)
+
+    return context_futures
+
+
+def _raise_context_failures(
+    contexts: list[SourceCaptureContext],
+    context_futures: list[dict[str, PrefectFuture]],
+):
+    """
+    Informa a etapa em que cada contexto falhou e levanta um erro caso alguma captura
+    não tenha sido concluída.
+
+    Args:
+        contexts (list[SourceCaptureContext]): Contextos da captura.
+        context_futures (list[dict[str, PrefectFuture]]): Futures das etapas de cada contexto.
+    """
+    failures = []
+    for context, futures in zip(contexts, context_futures, strict=True):
+        for stage, future in futures.items():
+            try:
+                future.wait()
+                state = future.state
+                message = None if state.is_completed() else state.message
+            except UpstreamTaskError as err:
+                # Tasks do pretreat_task_runner não chegam a ser executadas quando a etapa
+                # anterior falha e o erro da dependência é levantado pelo wait
+                message = str(err)
+
+            if message is not None:
+                failures.append(
+                    f"{context.source.table_id} - {context.timestamp.isoformat()} "
+                    f"(etapa {stage}): {message}"
+                )
+                break
+
+    captured = len(contexts) - len(failures)
+    print(f"{captured} de {len(contexts)} contextos capturados com sucesso")
+
+    if failures:
+        failures_str = "\n".join(failures)
+        print(f"Falhas:\n{failures_str}")
+        raise FailedCaptureContextsError(f"Falha na captura de {len(failures)} contexto(s)")
+
+
 def create_capture_flows_default_tasks(  # noqa: PLR0913
     env: Optional[str],
     sources: list[SourceTable],
@@ -33,6 +404,8 @@ def create_capture_flows_default_tasks(  # noqa: PLR0913
     tasks_wait_for: Optional[dict[str, list[Task]]] = None,
     if_exists_upload: str = "replace",
     should_capture_task: Optional[Task] = None,
+    max_contexts_in_flight: Optional[int] = None,
+    pretreat_task_runner: Optional[TaskRunner] = None,
 ) -> dict[str, Any]:
     """
     Cria o conjunto padrão de tasks para um fluxo de captura.
@@ -53,6 +426,16 @@ def create_capture_flows_default_tasks(  # noqa: PLR0913
         should_capture_task (Optional[Task]): Task de gate (opcional) que retorna um
             `ShouldCapture`. Executa após o setup do ambiente e, se `value` for False, interrompe
             a captura cedo. Se None, mantém o comportamento padrão (sempre captura).
+        max_contexts_in_flight (Optional[int]): Se definido, cada contexto passa pelas etapas
+            de extração, upload raw, pré-tratamento e upload source de forma independente, com
+            no máximo este número de contextos em execução ao mesmo tempo. A falha de um
+            contexto não interrompe os demais e é informada ao final. Se None, cada etapa
+            espera todos os contextos terminarem a etapa anterior.
+        pretreat_task_runner (Optional[TaskRunner]): Task runner usado na etapa de
+            pré-tratamento (ex.: `ProcessPoolTaskRunner` para usar todos os núcleos do worker).
+            Os contextos são enviados para o task runner e apenas os caminhos dos arquivos são
+            retornados. A extração, que é I/O, e os uploads sempre usam o task runner do flow.
+            Se None, todas as etapas usam o task runner do flow.
 
     Returns:
         dict: Dicionário com o retorno das tasks. Sempre inclui `should_capture` (bool) e
@@ -107,54 +490,33 @@ def create_capture_flows_default_tasks(  # noqa: PLR0913
     )
     contexts = tasks["contexts"]
 
-    data_extractor_future = create_extractor_task.map(
-        context=contexts,
-        wait_for=unmapped(tasks_wait_for.get("data_extractor")),
-    )
-
-    tasks["data_extractor"] = data_extractor_future.result()
-
-    get_raw_future = get_raw_data.map(
-        context=contexts,
-        data_extractor=tasks["data_extractor"],
-        wait_for=unmapped(tasks_wait_for.get("get_raw")),
-    )
-
-    tasks["get_raw"] = get_raw_future.result()
-
-    upload_raw_future = upload_raw_file_to_gcs.map(
-        context=contexts,
-        if_exists=unmapped(if_exists_upload),
-        wait_for=unmapped(
-            [
-                tasks["get_raw"],
-                tasks["setup_enviroment"],
-                *tasks_wait_for.get("upload_raw", []),
-            ]
-        ),
-    )
-
-    tasks["upload_raw"] = upload_raw_future.result()
-
-    pretreat_future = transform_raw_to_nested_structure.map(
-        context=contexts,
-        wait_for=unmapped([tasks["upload_raw"], *tasks_wait_for.get("pretreat", [])]),
-    )
+    with _start_task_runner(pretreat_task_runner) as started_pretreat_task_runner:
+        if max_contexts_in_flight is None:
+            tasks.update(
+                _run_staged_contexts(
+                    contexts=contexts,
+                    create_extractor_task=create_extractor_task,
+                    tasks_wait_for=tasks_wait_for,
+                    setup_environment_result=tasks["setup_enviroment"],
+                    if_exists_upload=if_exists_upload,
+                    pretreat_task_runner=started_pretreat_task_runner,
+                )
+            )
+            return tasks
 
-    tasks["pretreat"] = pretreat_future.result()
+        context_futures = _run_pipelined_contexts(
+            contexts=contexts,
+            max_contexts_in_flight=max_contexts_in_flight,
+            create_extractor_task=create_extractor_task,
+            tasks_wait_for=tasks_wait_for,
+            setup_environment_result=tasks["setup_enviroment"],
+            if_exists_upload=if_exists_upload,
+            pretreat_task_runner=started_pretreat_task_runner,
+        )
 
-    upload_source_future = upload_source_data_to_gcs.map(
-        context=contexts,
-        if_exists=unmapped(if_exists_upload),
-        wait_for=unmapped(
-            [
-                tasks["pretreat"],
-                tasks["setup_enviroment"],
-                *tasks_wait_for.get("upload_source", []),
-            ]
-        ),
-    )
+    _raise_context_failures(contexts=contexts, context_futures=context_futures)
 
-    tasks["upload_source"] = upload_source_future.result()
+    for stage in ("data_extractor", "get_raw", "upload_raw", "pretreat", "upload_source"):
+        tasks[stage] = [futures[stage].result() for futures in context_futures]
 
     return tasks
@@ -1,22 +1,25 @@
 # -*- coding: utf-8 -*-
-import io
-import zipfile
+from collections.abc import Iterator
 from datetime import datetime
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 from zoneinfo import ZoneInfo
 
 import pandas as pd
 from prefect import task
 from prefect.cache_policies import NO_CACHE
+from redis.exceptions import RedisError
 
 from pipelines.common import constants as smtr_constants
-from pipelines.common.capture.default_capture.utils import (
-    SourceCaptureContext,
-    constants,
+from pipelines.common.capture.default_capture.utils import SourceCaptureContext
+from pipelines.common.utils.fs import (
+    parquet_file_writer,
+    read_raw_data,
+    read_raw_data_batches,
+    save_local_file,
+    save_local_file_stream,
 )
-from pipelines.common.utils.fs import read_raw_data, save_local_file
 from pipelines.common.utils.gcp.bigquery import SourceTable
-from pipelines.common.utils.gcp.storage import Storage
+from pipelines.common.utils.gcp.storage import Storage, open_zip_blob
 from pipelines.common.utils.pretreatment import (
     create_timestamp_captura,
     transform_to_nested_structure,
@@ -88,22 +91,67 @@ def create_capture_contexts(  # noqa: PLR0913
 
 
 @task(cache_policy=NO_CACHE, tags=["data-processing"])
-def get_raw_data(context: SourceCaptureContext, data_extractor: Callable):
+def get_raw_data(
+    context: SourceCaptureContext,
+    data_extractor: Callable,
+) -> Union[list[str], list[list[str]]]:
     """
     Extrai os dados brutos e salva os caminhos dos arquivos no contexto.
 
+    Se o contexto tiver `coalesced_contexts`, a função de extração captura todos os contextos
+    do grupo e retorna os caminhos dos arquivos de cada um deles.
+
     Args:
         context (SourceCaptureContext): Contexto da captura.
         data_extractor (Callable): Função responsável por extrair e salvar os dados brutos.
+
+    Returns:
+        Union[list[str], list[list[str]]]: Caminhos dos arquivos brutos salvos ou, para
+            contextos agrupados, os caminhos de cada contexto do grupo. As tasks seguintes
+            recebem estes caminhos pelo argumento `raw_filepaths`, pois o pré-tratamento pode
+            ser executado em outro processo, onde as alterações no contexto não são propagadas.
     """
 
     captured_raw_filepaths = data_extractor()
 
-    context.captured_raw_filepaths = captured_raw_filepaths
+    if context.coalesced_contexts:
+        for coalesced_context, raw_filepaths in zip(
+            context.coalesced_contexts, captured_raw_filepaths, strict=True
+        ):
+            coalesced_context.captured_raw_filepaths = raw_filepaths
+    else:
+        context.captured_raw_filepaths = captured_raw_filepaths
+
+    return captured_raw_filepaths
 
 
 @task(cache_policy=NO_CACHE)
-def upload_raw_file_to_gcs(context: SourceCaptureContext, if_exists: str = "replace"):
+def get_coalesced_raw_filepaths(
+    context: SourceCaptureContext,
+    coalesced_raw_filepaths: list[list[str]],
+    index: int,
+) -> list[str]:
+    """
+    Seleciona os caminhos dos arquivos brutos de um contexto extraído em grupo.
+
+    Args:
+        context (SourceCaptureContext): Contexto da captura.
+        coalesced_raw_filepaths (list[list[str]]): Retorno da task `get_raw_data` do grupo.
+        index (int): Posição do contexto no grupo.
+
+    Returns:
+        list[str]: Caminhos dos arquivos brutos do contexto.
+    """
+    context.captured_raw_filepaths = coalesced_raw_filepaths[index]
+    return context.captured_raw_filepaths
+
+
+@task(cache_policy=NO_CACHE)
+def upload_raw_file_to_gcs(
+    context: SourceCaptureContext,
+    if_exists: str = "replace",
+    raw_filepaths: Optional[list[str]] = None,
+) -> list[str]:
     """
     Envia os arquivos brutos para o GCS.
 
@@ -112,68 +160,166 @@ def upload_raw_file_to_gcs(context: SourceCaptureContext, if_exists: str = "repl
             do atributo captured_raw_filepaths.
         if_exists (str): Ação a ser tomada caso o arquivo exista
                 no storage (raise, pass, replace)
+        raw_filepaths (Optional[list[str]]): Caminhos retornados pela task `get_raw_data`.
+            Se informado, substitui o atributo captured_raw_filepaths do contexto.
+
+    Returns:
+        list[str]: Caminhos dos arquivos enviados, usados pela etapa de pré-tratamento.
     """
-    for path in context.captured_raw_filepaths:
-        context.source.upload_raw_file(
-            raw_filepath=path,
-            partition=context.partition,
-            if_exists=if_exists,
-        )
+    if raw_filepaths is not None:
+        context.captured_raw_filepaths = raw_filepaths
 
+    context.source.upload_raw_files(
+        raw_filepaths=context.captured_raw_filepaths,
+        partition=context.partition,
+        if_exists=if_exists,
+    )
 
-@task(cache_policy=NO_CACHE, tags=["data-processing"])
-def transform_raw_to_nested_structure(context: SourceCaptureContext):
+    return context.captured_raw_filepaths
+
+
+def _pretreat_raw_data(
+    data: pd.DataFrame,
+    context: SourceCaptureContext,
+    captura: str,
+) -> pd.DataFrame:
     """
-    Aplica pré-tratamentos e transforma os dados brutos em estrutura aninhada.
+    Aplica os pré-tratamentos do source e transforma os dados em estrutura aninhada.
+
+    Args:
+        data (pd.DataFrame): Dados brutos.
+        context (SourceCaptureContext): Contexto da captura.
+        captura (str): Valor da coluna _datetime_execucao_flow.
+
+    Returns:
+        pd.DataFrame: Dados no formato da tabela source.
+    """
+    primary_keys = context.source.primary_keys
+    data_columns_len = len(data.columns)
+
+    for step in context.source.pretreat_funcs:
+        data = step(data=data, context=context)
+
+    data["_datetime_execucao_flow"] = captura
+
+    if len(primary_keys) < data_columns_len:
+        data = transform_to_nested_structure(data=data, primary_keys=primary_keys)
+
+    data["timestamp_captura"] = create_timestamp_captura(timestamp=context.timestamp)
+
+    return data
+
+
+def _iter_pretreated_data(context: SourceCaptureContext) -> Iterator[pd.DataFrame]:
+    """
+    Lê os arquivos raw do contexto e retorna os dados pré-tratados no formato da tabela source.
+
+    Se o source tiver `pretreatment_batch_size` definido, cada arquivo raw é lido
+    e tratado em lotes.
 
     Args:
         context (SourceCaptureContext): Contexto da captura após a definição
             do atributo captured_raw_filepaths.
+
+    Returns:
+        Iterator[pd.DataFrame]: Dados pré-tratados. Arquivos raw vazios retornam
+            um DataFrame vazio.
     """
-    csv_mode = "w"
     source = context.source
-    timestamp = context.timestamp
-    primary_keys = source.primary_keys
-    source_filetype = constants.SOURCE_FILETYPE
+    batch_size = source.pretreatment_batch_size
 
     for raw_filepath in context.captured_raw_filepaths:
-        data = read_raw_data(
-            filepath=raw_filepath,
-            reader_args=source.pretreatment_reader_args,
+        if batch_size is None:
+            batches = [
+                read_raw_data(
+                    filepath=raw_filepath,
+                    reader_args=source.pretreatment_reader_args,
+                )
+            ]
+        else:
+            batches = read_raw_data_batches(
+                filepath=raw_filepath,
+                batch_size=batch_size,
+                reader_args=source.pretreatment_reader_args,
+            )
+
+        captura = create_timestamp_captura(
+            timestamp=datetime.now(tz=ZoneInfo(smtr_constants.TIMEZONE))
         )
+        is_empty = True
 
-        if data.empty:
+        for batch_number, raw_data in enumerate(batches):
+            if raw_data.empty:
+                continue
+
+            is_empty = False
+            if batch_size is None:
+                print(f"Raw data:\n{data_info_str(raw_data)}")
+            else:
+                print(f"Lote {batch_number}: {len(raw_data)} registros")
+
+            data = _pretreat_raw_data(data=raw_data, context=context, captura=captura)
+
+            if batch_size is None:
+                print(f"Estrutura aninhada criada! Dados: \n{data_info_str(data)}")
+
+            yield data
+
+        if is_empty:
             print("Dataframe vazio, pulando tratamento...")
-            data = pd.DataFrame()
-        else:
-            print(f"Raw data:\n{data_info_str(data)}")
+            yield pd.DataFrame()
 
-            data_columns_len = len(data.columns)
-            captura = create_timestamp_captura(
-                timestamp=datetime.now(tz=ZoneInfo(smtr_constants.TIMEZONE))
-            )
 
-            for step in source.pretreat_funcs:
-                data = step(data=data, context=context)
+@task(cache_policy=NO_CACHE, tags=["data-processing"])
+def transform_raw_to_nested_structure(
+    context: SourceCaptureContext,
+    raw_filepaths: Optional[list[str]] = None,
+) -> str:
+    """
+    Aplica pré-tratamentos e transforma os dados brutos em estrutura aninhada.
 
-            data["_datetime_execucao_flow"] = captura
+    Os dados são salvos no formato definido em `source_filetype` do source (csv ou parquet).
 
-            if len(primary_keys) < data_columns_len:
-                data = transform_to_nested_structure(data=data, primary_keys=primary_keys)
+    Args:
+        context (SourceCaptureContext): Contexto da captura após a definição
+            do atributo captured_raw_filepaths.
+        raw_filepaths (Optional[list[str]]): Caminhos retornados pela task
+            `upload_raw_file_to_gcs`. Se informado, substitui o atributo
+            captured_raw_filepaths do contexto.
 
-            data["timestamp_captura"] = create_timestamp_captura(timestamp=timestamp)
+    Returns:
+        str: Caminho do arquivo source salvo.
+    """
+    if raw_filepaths is not None:
+        context.captured_raw_filepaths = raw_filepaths
 
-        print(f"Estrutura aninhada criada! Dados: \n{data_info_str(data)}")
+    source = context.source
+    source_filepath = context.source_filepath
+    pretreated_data = _iter_pretreated_data(context=context)
 
-        source_filepath = context.source_filepath
-        save_local_file(
+    if source.source_filetype == "parquet":
+        with parquet_file_writer(
             filepath=source_filepath,
-            filetype=source_filetype,
-            data=data,
-            csv_mode=csv_mode,
-        )
-        csv_mode = "a"
-        print(f"Dados salvos em {source_filepath}")
+            empty_columns=[*source.primary_keys, "content", "timestamp_captura"],
+            compression=source.parquet_compression,
+        ) as write:
+            for data in pretreated_data:
+                if not data.empty:
+                    write(data)
+    else:
+        csv_mode = "w"
+        for data in pretreated_data:
+            save_local_file(
+                filepath=source_filepath,
+                filetype=source.source_filetype,
+                data=data,
+                csv_mode=csv_mode,
+            )
+            csv_mode = "a"
+
+    print(f"Dados salvos em {source_filepath}")
+
+    return source_filepath
 
 
 @task(cache_policy=NO_CACHE)
@@ -201,9 +347,18 @@ def upload_source_data_to_gcs(context: SourceCaptureContext, if_exists: str = "r
         print("Tabela de staging criada")
     else:
         print("Tabela de staging já existe, adicionando dados...")
+        # Todas as tabelas existentes foram criadas em CSV, então a checagem é feita apenas
+        # para os demais formatos
+        if source.source_filetype != "csv":
+            source.check_source_filetype()
         source.append(source_filepath=source_filepath, partition=partition, if_exists=if_exists)
         print("Dados adicionados")
 
+    try:
+        source.add_to_capture_manifest(timestamps=[context.timestamp])
+    except RedisError as e:
+        print(f"Erro ao salvar timestamp no manifesto de capturas: {e}")
+
 
 @task(cache_policy=NO_CACHE)
 def get_raw_from_gcs(
@@ -239,14 +394,13 @@ def get_raw_from_gcs(
             print(f"[GCS] Arquivo não encontrado: {blob_path}")
             return []
 
-        # Baixa e extrai o ZIP
-        data = blob.download_as_bytes()
-        with zipfile.ZipFile(io.BytesIO(data), "r") as zipped_file:
-            raw_text = zipped_file.read(f"{filename}.txt").decode("utf-8")
-
-        # Salva localmente como texto bruto (igual ao get_raw_ftp)
+        # Lê o ZIP direto do GCS e salva localmente como texto bruto (igual ao get_raw_ftp)
         filepath = context.raw_filepath.format(page=0)
-        save_local_file(filepath=filepath, filetype="txt", data=raw_text)
+        with (
+            open_zip_blob(blob) as zipped_file,
+            zipped_file.open(f"{filename}.txt") as member,
+        ):
+            save_local_file_stream(filepath=filepath, stream=member, encoding="utf-8")
 
         print(f"[GCS] Dados carregados com sucesso: {filepath}")
         return [filepath]
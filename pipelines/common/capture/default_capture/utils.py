@@ -26,6 +26,10 @@ class ShouldCapture(NamedTuple):
     payload: Optional[dict] = None
 
 
+class FailedCaptureContextsError(Exception):
+    """Erro para ser usado quando a captura de um ou mais contextos falha"""
+
+
 class SourceCaptureContext:
     def __init__(
         self,
@@ -49,6 +53,9 @@ class SourceCaptureContext:
         self.raw_filepath, self.source_filepath = self.get_filepaths()
 
         self.captured_raw_filepaths = []
+        # Contextos extraídos em uma única consulta junto com este contexto, incluindo ele
+        # mesmo. Definido por group_capture_contexts apenas no último contexto do grupo
+        self.coalesced_contexts: list[SourceCaptureContext] = []
 
     def get_partition(self) -> str:
         """
@@ -90,11 +97,51 @@ class SourceCaptureContext:
                 table_id=self.source.table_id,
                 partition=self.partition,
                 filename=filename,
-                filetype=self.source.raw_filetype,
+                filetype=self.source.source_filetype,
             )
         )
 
 
+def group_capture_contexts(
+    contexts: list[SourceCaptureContext],
+) -> list[list[SourceCaptureContext]]:
+    """
+    Agrupa contextos consecutivos de um mesmo source cujas janelas de captura são contíguas,
+    para que sejam extraídos em uma única consulta.
+
+    Os grupos respeitam o `max_coalesced_timestamps` do source. O último contexto de cada
+    grupo com mais de um contexto recebe a lista do grupo no atributo `coalesced_contexts`
+    e é o responsável pela extração.
+
+    Args:
+        contexts (list[SourceCaptureContext]): Contextos da captura.
+
+    Returns:
+        list[list[SourceCaptureContext]]: Grupos de contextos, na mesma ordem dos contextos.
+    """
+    groups = []
+    for context in contexts:
+        max_coalesced_timestamps = context.source.max_coalesced_timestamps
+        last_group = groups[-1] if groups else []
+        if (
+            max_coalesced_timestamps is not None
+            and last_group
+            and len(last_group) < max_coalesced_timestamps
+            and last_group[-1].source is context.source
+            and context.source.get_last_scheduled_timestamp(timestamp=context.timestamp)
+            == last_group[-1].timestamp
+        ):
+            last_group.append(context)
+        else:
+            groups.append([context])
+
+    for group in groups:
+        if len(group) > 1:
+            group[-1].coalesced_contexts = group
+
+    return groups
+
+
 def rename_capture_flow_run() -> str:
     """
     Gera o nome para execução de flows de captura.
@@ -113,6 +113,7 @@ def create_gps_extractor_kwargs(
     extractor_kwargs = {
         "url": url,
         "response_key": request_config.get("response_key"),
+        "stream_response": True,
     }
     extractor_kwargs.update(
         create_gps_authentication_kwargs(auth_config=auth_config, params=params)
@@ -86,6 +86,19 @@ JAE_DATABASE_SETTINGS = {
     },
 }
 
+# Número máximo de consultas simultâneas em cada banco de dados nas capturas divididas
+# em fatias (time_slices). Pode ser sobrescrito com a chave max_concurrent_queries
+# em JAE_DATABASE_SETTINGS
+JAE_MAX_CONCURRENT_QUERIES = 4
+
+# Número máximo de timestamps de recaptura contíguas extraídas em uma única consulta nas
+# tabelas com capture_window_column
+JAE_MAX_COALESCED_TIMESTAMPS = 30
+
+# Número máximo de contextos de captura executando ao mesmo tempo nos flows que capturam
+# várias tabelas de forma independente (max_contexts_in_flight)
+JAE_MAX_CONTEXTS_IN_FLIGHT = 4
+
 JAE_SECRET_PATH = "smtr_jae_access_data"
 JAE_PRIVATE_BUCKET_NAMES = {"prod": "rj-smtr-jae-private", "dev": "rj-smtr-dev-private"}
 ALERT_WEBHOOK = "alertas_bilhetagem"
@@ -120,6 +133,7 @@ JAE_TABLE_CAPTURE_PARAMS = {
                     AND data_processamento < timestamp '{end}' - INTERVAL '{delay} minutes'
             """,
         "database": "transacao_db",
+        "capture_window_column": "data_processamento",
         "capture_delay_minutes": {"0": 0, "2025-03-26 15:36:00": 5},
     },
     TRANSACAO_RIOCARD_TABLE_ID: {
@@ -133,6 +147,7 @@ JAE_TABLE_CAPTURE_PARAMS = {
                     AND data_processamento < timestamp '{end}' - INTERVAL '{delay} minutes'
             """,
         "database": "transacao_db",
+        "capture_window_column": "data_processamento",
         "capture_delay_minutes": {"0": 0, "2025-03-26 15:36:00": 5},
     },
     GPS_VALIDADOR_TABLE_ID: {
@@ -146,6 +161,7 @@ JAE_TABLE_CAPTURE_PARAMS = {
                     AND data_tracking < timestamp '{end}' - INTERVAL '{delay} minutes'
             """,
         "database": "tracking_db",
+        "capture_window_column": "data_tracking",
         "capture_delay_minutes": {"0": 0, "2025-03-26 15:31:00": 10},
     },
     TRANSACAO_ERRO_TABLE_ID: {
@@ -160,6 +176,7 @@ JAE_TABLE_CAPTURE_PARAMS = {
                 ORDER BY dt_inclusao
             """,
         "database": "processador_transacao_db",
+        "capture_window_column": "dt_inclusao",
         "capture_delay_minutes": {"0": 5},
     },
     TRANSACAO_ORDEM_TABLE_ID: {
@@ -178,6 +195,8 @@ JAE_TABLE_CAPTURE_PARAMS = {
                 ORDER BY data_processamento
             """,
         "database": "transacao_db",
+        "time_slices": 6,
+        "time_slice_inclusive_end": True,
     },
     TRANSACAO_RETIFICADA_TABLE_ID: {
         "query": """
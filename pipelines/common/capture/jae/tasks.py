@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """Tasks de captura dos dados da Jaé"""
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from functools import partial
 from zoneinfo import ZoneInfo
 
@@ -13,10 +13,17 @@ from pipelines.common import constants as smtr_constants
 from pipelines.common.capture.default_capture.utils import SourceCaptureContext
 from pipelines.common.capture.jae import constants
 from pipelines.common.capture.jae.utils import (
+    create_time_slices,
     get_capture_delay_minutes,
     get_jae_database_settings,
 )
-from pipelines.common.utils.extractors.db import get_raw_db, get_raw_db_paginated
+from pipelines.common.utils.extractors.db import (
+    get_raw_db_coalesced,
+    get_raw_db_copy,
+    get_raw_db_paginated,
+    get_raw_db_slices,
+    get_raw_db_streaming,
+)
 from pipelines.common.utils.secret import get_env_secret
 
 
@@ -24,7 +31,10 @@ from pipelines.common.utils.secret import get_env_secret
 def create_jae_general_extractor(context: SourceCaptureContext):
     """Cria a extração de tabelas da Jaé"""
 
-    if context.source.table_id == constants.GPS_VALIDADOR_TABLE_ID and context.timestamp < datetime(
+    contexts = context.coalesced_contexts or [context]
+    first_timestamp = contexts[0].timestamp
+
+    if context.source.table_id == constants.GPS_VALIDADOR_TABLE_ID and first_timestamp < datetime(
         2025, 3, 26, 15, 31, 0, tzinfo=ZoneInfo(smtr_constants.TIMEZONE)
     ):
         raise ValueError(
@@ -35,7 +45,7 @@ def create_jae_general_extractor(context: SourceCaptureContext):
     credentials = get_env_secret(constants.JAE_SECRET_PATH)
     params = constants.JAE_TABLE_CAPTURE_PARAMS[context.source.table_id]
 
-    start = context.source.get_last_scheduled_timestamp(timestamp=context.timestamp).astimezone(
+    start = context.source.get_last_scheduled_timestamp(timestamp=first_timestamp).astimezone(
         tz=timezone("UTC")
     )
     end = context.timestamp.astimezone(tz=timezone("UTC"))
@@ -44,34 +54,106 @@ def create_jae_general_extractor(context: SourceCaptureContext):
         start = start.replace(hour=0, minute=0, second=0)
         end = end.replace(hour=6, minute=0, second=0)
 
-    start = start.strftime("%Y-%m-%d %H:%M:%S")
-    end = end.strftime("%Y-%m-%d %H:%M:%S")
+    time_slices = params.get("time_slices")
+    if time_slices is None:
+        windows = [(start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S"))]
+    else:
+        windows = create_time_slices(
+            start=start,
+            end=end,
+            slices=time_slices,
+            inclusive_end=params.get("time_slice_inclusive_end", False),
+        )
     capture_delay_minutes = params.get("capture_delay_minutes", {"0": 0})
 
-    delay = get_capture_delay_minutes(
-        capture_delay_minutes=capture_delay_minutes, timestamp=context.timestamp
-    )
+    delays = {
+        get_capture_delay_minutes(
+            capture_delay_minutes=capture_delay_minutes, timestamp=c.timestamp
+        )
+        for c in contexts
+    }
+    if len(delays) > 1:
+        raise ValueError("Os contextos agrupados possuem atrasos de captura diferentes")
+    delay = delays.pop()
 
-    query = params["query"].format(
-        start=start,
-        end=end,
-        delay=delay,
-    )
+    queries = [
+        params["query"].format(
+            start=window_start,
+            end=window_end,
+            delay=delay,
+        )
+        for window_start, window_end in windows
+    ]
     database_name = params["database"]
     database = get_jae_database_settings(database_name)
     print(database["host"])
     general_func_arguments = {
-        "query": query,
         "engine": database["engine"],
         "host": database["host"],
         "user": credentials["user"],
         "password": credentials["password"],
         "database": database_name,
         "max_retries": 3,
-        "raw_filepath": context.raw_filepath,
     }
-    if context.source.file_chunk_size is not None:
+    if context.coalesced_contexts:
+        window_column = params.get("capture_window_column")
+        if (
+            window_column is None
+            or time_slices is not None
+            or context.source.file_chunk_size is not None
+            or context.source.raw_filetype != "json"
+        ):
+            raise ValueError(
+                f"A tabela {context.source.table_id} não suporta a extração agrupada de contextos"
+            )
+        delay_timedelta = timedelta(minutes=delay)
         return partial(
-            get_raw_db_paginated, page_size=context.source.file_chunk_size, **general_func_arguments
+            get_raw_db_coalesced,
+            query=queries[0],
+            raw_filepaths=[c.raw_filepath for c in contexts],
+            windows=[
+                (
+                    c.source.get_last_scheduled_timestamp(timestamp=c.timestamp) - delay_timedelta,
+                    c.timestamp - delay_timedelta,
+                )
+                for c in contexts
+            ],
+            window_column=window_column,
+            **general_func_arguments,
         )
-    return partial(get_raw_db, **general_func_arguments)
+
+    if context.source.raw_filetype == "csv":
+        reader_args = context.source.pretreatment_reader_args or {}
+        get_raw_function = partial(get_raw_db_copy, compression=reader_args.get("compression"))
+    elif context.source.file_chunk_size is not None:
+        if time_slices is not None:
+            raise ValueError("time_slices não pode ser usado junto com file_chunk_size")
+        return partial(
+            get_raw_db_paginated,
+            query=queries[0],
+            raw_filepath=context.raw_filepath,
+            page_size=context.source.file_chunk_size,
+            pagination_key=context.source.pagination_key,
+            **general_func_arguments,
+        )
+    else:
+        get_raw_function = get_raw_db_streaming
+
+    if time_slices is None:
+        return partial(
+            get_raw_function,
+            query=queries[0],
+            raw_filepath=context.raw_filepath,
+            **general_func_arguments,
+        )
+
+    return partial(
+        get_raw_db_slices,
+        queries=queries,
+        raw_filepath=context.raw_filepath,
+        max_concurrent_queries=database.get(
+            "max_concurrent_queries", constants.JAE_MAX_CONCURRENT_QUERIES
+        ),
+        get_raw_function=get_raw_function,
+        **general_func_arguments,
+    )
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from datetime import datetime
+from datetime import datetime, timedelta
+from itertools import pairwise
 
 from pipelines.common.capture.jae import constants
 from pipelines.common.utils.utils import convert_timezone, is_running_locally
@@ -43,6 +44,43 @@ def get_capture_delay_minutes(capture_delay_minutes: dict[str, int], timestamp:
     return int(delay)
 
 
+def create_time_slices(
+    start: datetime,
+    end: datetime,
+    slices: int,
+    inclusive_end: bool = False,
+) -> list[tuple[str, str]]:
+    """
+    Divide a janela de captura em fatias consecutivas de mesmo tamanho
+
+    Args:
+        start (datetime): Início da janela de captura
+        end (datetime): Fim da janela de captura
+        slices (int): Número de fatias
+        inclusive_end (bool): Se a query filtra o fim da janela de forma inclusiva (<=).
+            Nesse caso, o fim de cada fatia é 1 microssegundo antes do início da próxima
+
+    Returns:
+        list[tuple[str, str]]: Início e fim de cada fatia, formatados para a query
+    """
+    if slices <= 0:
+        raise ValueError("slices deve ser maior que zero")
+
+    window_seconds = int((end - start).total_seconds())
+    bounds = [start + timedelta(seconds=window_seconds * i // slices) for i in range(slices)]
+    bounds.append(end)
+
+    time_slices = []
+    for slice_start, slice_end in pairwise(bounds):
+        if inclusive_end and slice_end != end:
+            end_str = (slice_end - timedelta(microseconds=1)).strftime("%Y-%m-%d %H:%M:%S.%f")
+        else:
+            end_str = slice_end.strftime("%Y-%m-%d %H:%M:%S")
+        time_slices.append((slice_start.strftime("%Y-%m-%d %H:%M:%S"), end_str))
+
+    return time_slices
+
+
 def get_jae_database_settings(database_name: str) -> dict:
     """
     Pega os dados de configuração do banco de dados da Jaé
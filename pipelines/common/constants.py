@@ -14,7 +14,79 @@ RETRY_DELAY = 10
 
 DEFAULT_FLOW_TIMEOUT = 3600
 
+# Tamanho do pool de conexões HTTP dos clients do GCP. Deve ser maior ou igual ao número de
+# operações simultâneas no GCS (GCS_MAX_CONCURRENT_OPERATIONS) e de threads do task runner
+GCP_CLIENT_POOL_SIZE = 32
+
+# Número máximo de operações simultâneas (uploads, cópias e listagens) no GCS
+GCS_MAX_CONCURRENT_OPERATIONS = 16
+
+# Tamanho dos blocos lidos para calcular o checksum de arquivos antes do upload
+GCS_CHECKSUM_READ_SIZE = 8 * 1024 * 1024
+
+# Tamanho dos blocos lidos e enviados ao GCS nas operações em streaming
+# (deve ser múltiplo de 256 KB)
+GCS_STREAM_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Uploads em partes paralelas (parallel composite upload): arquivos a partir de
+# GCS_COMPOSITE_UPLOAD_THRESHOLD bytes são divididos em até GCS_COMPOSE_MAX_COMPONENTS
+# partes, enviadas em paralelo e combinadas no GCS
+GCS_COMPOSITE_UPLOAD_THRESHOLD = 150 * 1024 * 1024
+GCS_COMPOSITE_UPLOAD_MIN_PART_SIZE = 32 * 1024 * 1024
+GCS_COMPOSITE_UPLOAD_MAX_WORKERS = 8
+GCS_COMPOSE_MAX_COMPONENTS = 32
+# Pasta raiz das partes temporárias, fora das pastas lidas pelas tabelas externas. As partes
+# de uploads abandonados não são apagadas pelo código: os buckets devem ter uma regra de ciclo
+# de vida que apague objetos com esse prefixo após 7 dias, ex.: {"action": {"type": "Delete"},
+# "condition": {"age": 7, "matchesPrefix": ["tmp/composite_upload/"]}}
+GCS_COMPOSITE_UPLOAD_PREFIX = "tmp/composite_upload"
+# O tamanho das partes e dos blocos enviados deve ser múltiplo de 256 KB
+GCS_UPLOAD_CHUNK_MULTIPLE = 256 * 1024
+
+# Formatos aceitos para os arquivos source e as tabelas externas do BigQuery
+SOURCE_FILETYPES = ("csv", "parquet")
+
+# Manifesto de capturas no Redis: timestamps mais antigas que CAPTURE_MANIFEST_RETENTION_DAYS
+# são removidas e as lacunas são conferidas no GCS em no máximo CAPTURE_MANIFEST_MAX_RELIST_DAYS
+# dias antes da timestamp da busca
+CAPTURE_MANIFEST_RETENTION_DAYS = 30
+CAPTURE_MANIFEST_MAX_RELIST_DAYS = 2
+
+# Cache no Redis dos datasets e tabelas de cada projeto do BigQuery, consultados no
+# INFORMATION_SCHEMA da região BIGQUERY_METADATA_REGION. Uma tabela apagada pode constar
+# como existente por até BIGQUERY_METADATA_CACHE_TTL_SECONDS
+BIGQUERY_METADATA_CACHE_TTL_SECONDS = 10 * 60
+BIGQUERY_METADATA_REGION = "region-us"
+
+# Pool de conexões dos engines do SQLAlchemy compartilhados por processo
+DB_POOL_SIZE = 5
+DB_POOL_MAX_OVERFLOW = 10
+DB_POOL_RECYCLE_SECONDS = 1800
+
+# Espera entre as tentativas de consultas em bancos de dados (backoff exponencial)
+DB_RETRY_BACKOFF_SECONDS = 2
+DB_RETRY_MAX_BACKOFF_SECONDS = 60
+
 HTTP_SERVER_ERROR_STATUS = 500
+HTTP_TOO_MANY_REQUESTS_STATUS = 429
+
+# Pool de conexões da sessão HTTP compartilhada por processo
+HTTP_POOL_MAX_HOSTS = 10
+HTTP_POOL_SIZE_PER_HOST = 10
+
+# Espera entre as tentativas de requisições HTTP (backoff exponencial com jitter)
+HTTP_RETRY_BACKOFF_SECONDS = 5
+HTTP_RETRY_MAX_BACKOFF_SECONDS = 60
+HTTP_RETRY_AFTER_MAX_SECONDS = 300
+
+# Tamanho dos blocos gravados em disco ao salvar respostas HTTP em streaming
+HTTP_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Tamanho dos blocos lidos nos downloads de arquivos do FTP
+FTP_DOWNLOAD_BLOCK_SIZE = 1024 * 1024
+
+# Número máximo de requisições simultâneas nas capturas concorrentes de APIs
+API_MAX_CONCURRENT_REQUESTS = 10
 
 WEBHOOKS_SECRET_PATH = "webhooks"
 OWNERS_DISCORD_MENTIONS = {
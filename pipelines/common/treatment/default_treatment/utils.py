@@ -25,7 +25,11 @@ from pipelines.common.treatment.default_treatment import constants
 from pipelines.common.utils.cron import cron_get_last_date, cron_get_next_date
 from pipelines.common.utils.discord import format_send_discord_message
 from pipelines.common.utils.fs import get_project_root_path
-from pipelines.common.utils.gcp.bigquery import SourceTable
+from pipelines.common.utils.gcp.bigquery import (
+    SourceTable,
+    get_bigquery_metadata,
+    invalidate_bigquery_metadata,
+)
 from pipelines.common.utils.openmetadata import preserve_dbt_run_results
 from pipelines.common.utils.prefect import rename_flow_run
 from pipelines.common.utils.redis import get_redis_client
@@ -575,7 +579,8 @@ def get_missing_dbt_relations(nodes: list[dict]) -> list[dict]:
 
     Considera apenas materializações que geram relação (incremental, materialized_view,
     table, view) e consulta as tabelas existentes por dataset (``database.schema``),
-    comparando pelo ``alias`` de cada nó.
+    comparando pelo ``alias`` de cada nó. As tabelas são buscadas nos metadados salvos
+    no Redis e a API só é consultada para confirmar as relações ausentes.
 
     Args:
         nodes (list[dict]): Nós retornados por ``dbt ls --output json`` (com ``database``,
@@ -594,8 +599,17 @@ def get_missing_dbt_relations(nodes: list[dict]) -> list[dict]:
     for node in relation_nodes:
         nodes_by_dataset[(node["database"], node["schema"])].append(node)
 
+    metadata_by_project = {}
     missing_nodes = []
     for (database, schema), dataset_nodes in nodes_by_dataset.items():
+        if database not in metadata_by_project:
+            metadata_by_project[database] = get_bigquery_metadata(project_id=database)
+        metadata = metadata_by_project[database]
+
+        cached_relations = set() if metadata is None else metadata.get(schema, set())
+        if all(node["alias"] in cached_relations for node in dataset_nodes):
+            continue
+
         client = bigquery.Client(project=database)
         try:
             existing_relations = {
@@ -604,6 +618,9 @@ def get_missing_dbt_relations(nodes: list[dict]) -> list[dict]:
         except NotFound:
             existing_relations = set()
 
+        if metadata is not None and not existing_relations <= cached_relations:
+            invalidate_bigquery_metadata(project_id=database)
+
         missing_nodes.extend(
             node for node in dataset_nodes if node["alias"] not in existing_relations
         )
@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
+import os
+import threading
+
 from sqlalchemy import Engine, create_engine, text
 from sqlalchemy.exc import OperationalError
 
+from pipelines.common import constants
+
 ENGINE_MAPPING = {
     "mysql": {"driver": "pymysql", "port": "3306"},
     "postgresql": {"driver": "psycopg2", "port": "5432"},
@@ -34,6 +39,96 @@ def create_database_url(
     return f"{engine}+{driver}://{user}:{password}@{host}:{port}/{database}"
 
 
+_ENGINES: dict[tuple[int, str], Engine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def get_engine(url: str) -> Engine:
+    """
+    Retorna o engine compartilhado do processo para uma URL de conexão, criando-o
+    na primeira chamada.
+
+    As conexões são mantidas em um pool, testadas antes do uso (pre-ping) e recicladas
+    periodicamente, para que consultas consecutivas não refaçam a conexão com o banco.
+
+    Args:
+        url (str): URL de conexão criada por create_database_url
+
+    Returns:
+        Engine: engine do SQLAlchemy
+    """
+    # O pid faz parte da chave para que processos filhos não reutilizem
+    # as conexões abertas pelo processo pai
+    key = (os.getpid(), url)
+    engine = _ENGINES.get(key)
+    if engine is not None:
+        return engine
+
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = create_engine(
+                url,
+                pool_size=constants.DB_POOL_SIZE,
+                max_overflow=constants.DB_POOL_MAX_OVERFLOW,
+                pool_recycle=constants.DB_POOL_RECYCLE_SECONDS,
+                pool_pre_ping=True,
+            )
+            _ENGINES[key] = engine
+
+    return engine
+
+
+def dispose_engines():
+    """
+    Fecha as conexões dos engines criados pelo processo e os remove do registro
+    """
+    pid = os.getpid()
+    with _ENGINES_LOCK:
+        for key in [k for k in _ENGINES if k[0] == pid]:
+            _ENGINES.pop(key).dispose()
+
+
+_SEMAPHORES: dict[str, threading.BoundedSemaphore] = {}
+
+
+def get_database_semaphore(url: str, max_concurrent_queries: int) -> threading.BoundedSemaphore:
+    """
+    Retorna o semáforo do processo que limita as consultas simultâneas em um banco de dados.
+    O limite é definido na primeira chamada para a URL.
+
+    Args:
+        url (str): URL de conexão criada por create_database_url
+        max_concurrent_queries (int): Número máximo de consultas simultâneas
+
+    Returns:
+        threading.BoundedSemaphore: semáforo do banco de dados
+    """
+    with _ENGINES_LOCK:
+        semaphore = _SEMAPHORES.get(url)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max_concurrent_queries)
+            _SEMAPHORES[url] = semaphore
+
+    return semaphore
+
+
+def get_retry_wait_seconds(retry: int) -> float:
+    """
+    Calcula a espera antes da próxima tentativa de uma consulta (backoff exponencial)
+
+    Args:
+        retry (int): Número da tentativa que falhou, começando em 1
+
+    Returns:
+        float: Tempo de espera em segundos
+    """
+    return min(
+        constants.DB_RETRY_BACKOFF_SECONDS * 2 ** (retry - 1),
+        constants.DB_RETRY_MAX_BACKOFF_SECONDS,
+    )
+
+
 def test_database_connection(
     engine: str,
     host: str,
@@ -62,7 +157,7 @@ def test_database_connection(
         password=password,
         database=database,
     )
-    connection = create_engine(url)
+    connection = get_engine(url)
     print(f"Tentando conexão com o banco de dados {database}")
     try:
         with connection.connect() as _:
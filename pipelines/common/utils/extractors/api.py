@@ -1,53 +1,102 @@
 # -*- coding: utf-8 -*-
 """Module to get data from APIs"""
 
+import io
+import shutil
+import tempfile
 import time
-from typing import Union
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
 
+import orjson
 import requests
 
 from pipelines.common import constants
 from pipelines.common.utils.fs import save_local_file
+from pipelines.common.utils.http import (
+    get_http_retry_wait_seconds,
+    get_http_session,
+    is_retryable_response,
+)
+
+
+def _get_api_response(
+    url: str,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
+    timeout: Optional[int] = constants.MAX_TIMEOUT_SECONDS,
+    stream: bool = False,
+) -> requests.Response:
+    """
+    Send a GET request to an API endpoint and return the successful response.
+
+    Requests reuse the process-wide pooled session. Server errors, rate limiting
+    (429) and connection failures are retried with exponential backoff and jitter,
+    honoring the Retry-After header when the server sends it.
+
+    Args:
+        url (str): API endpoint URL
+        headers (Optional[dict]): Request headers
+        params (Optional[dict]): Request parameters
+        timeout (Optional[int]): Request timeout in seconds. Defaults to MAX_TIMEOUT_SECONDS.
+        stream (bool): If True, the response body is not downloaded until it is read
+
+    Returns:
+        requests.Response: API response
+    """
+    session = get_http_session()
+    for retry in range(1, constants.MAX_RETRIES + 1):
+        try:
+            response = session.get(
+                url,
+                headers=headers,
+                timeout=timeout,
+                params=params,
+                stream=stream,
+            )
+        except (requests.ConnectionError, requests.Timeout) as err:
+            if retry == constants.MAX_RETRIES:
+                raise
+            wait_seconds = get_http_retry_wait_seconds(retry=retry)
+            print(f"Request error: {err}. Retrying in {wait_seconds:.1f}s")
+            time.sleep(wait_seconds)
+            continue
+
+        if response.ok:
+            return response
+
+        response.close()
+        if not is_retryable_response(response) or retry == constants.MAX_RETRIES:
+            response.raise_for_status()
+        wait_seconds = get_http_retry_wait_seconds(retry=retry, response=response)
+        print(f"Server error {response.status_code}. Retrying in {wait_seconds:.1f}s")
+        time.sleep(wait_seconds)
+
+    return response
 
 
 def get_api_data(
     url: str,
-    headers: Union[None, dict] = None,
-    params: Union[None, dict] = None,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
     raw_filetype: str = "json",
-    timeout: Union[None, int] = constants.MAX_TIMEOUT_SECONDS,
+    timeout: Optional[int] = constants.MAX_TIMEOUT_SECONDS,
 ) -> Union[str, dict, list[dict]]:
     """
     Get data from a single API endpoint.
 
     Args:
         url (str): API endpoint URL
-        headers (Union[None, dict]): Request headers
-        params (Union[None, dict]): Request parameters
+        headers (Optional[dict]): Request headers
+        params (Optional[dict]): Request parameters
         raw_filetype (str): File type for response (json, csv, etc.)
-        timeout (Union[None, int]): Request timeout in seconds. Defaults to MAX_TIMEOUT_SECONDS.
+        timeout (Optional[int]): Request timeout in seconds. Defaults to MAX_TIMEOUT_SECONDS.
 
     Returns:
         Union[str, dict, list[dict]]: API response data
     """
-
-    for retry in range(constants.MAX_RETRIES):
-        response = requests.get(
-            url,
-            headers=headers,
-            timeout=timeout,
-            params=params,
-        )
-
-        if response.ok:
-            break
-        if response.status_code >= constants.HTTP_SERVER_ERROR_STATUS:
-            print(f"Server error {response.status_code}")
-            if retry == constants.MAX_RETRIES - 1:
-                response.raise_for_status()
-            time.sleep(60)
-        else:
-            response.raise_for_status()
+    response = _get_api_response(url=url, headers=headers, params=params, timeout=timeout)
 
     if raw_filetype == "json":
         data = response.json()
@@ -57,13 +106,60 @@ def get_api_data(
     return data
 
 
+def download_api_data(  # noqa: PLR0913
+    url: str,
+    filepath: str,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
+    response_key: Optional[str] = None,
+    timeout: Optional[int] = constants.MAX_TIMEOUT_SECONDS,
+):
+    """
+    Stream a single API response body to a local file.
+
+    Without response_key, the body is written as received, in chunks, without being
+    parsed. With response_key, the whole body is buffered in memory and parsed once with
+    orjson, and only data[response_key] is written.
+
+    Args:
+        url (str): API endpoint URL
+        filepath (str): Destination file path
+        headers (Optional[dict]): Request headers
+        params (Optional[dict]): Request parameters
+        response_key (Optional[str]): If set, saves only data[response_key] of the JSON body
+        timeout (Optional[int]): Request timeout in seconds. Defaults to MAX_TIMEOUT_SECONDS.
+    """
+    print(f"Saving data on local file: {filepath}")
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+    with (
+        _get_api_response(
+            url=url,
+            headers=headers,
+            params=params,
+            timeout=timeout,
+            stream=True,
+        ) as response,
+        Path(filepath).open("wb") as file,
+    ):
+        if response_key is None:
+            for chunk in response.iter_content(chunk_size=constants.HTTP_STREAM_CHUNK_SIZE):
+                file.write(chunk)
+        else:
+            data = orjson.loads(response.content)[response_key]
+            file.write(orjson.dumps(data))
+
+    print("File saved!")
+
+
 def get_raw_api(  # noqa: PLR0913
     url: str,
     raw_filepath: str,
-    headers: Union[None, dict] = None,
-    params: Union[None, dict] = None,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
     raw_filetype: str = "json",
-    response_key: Union[None, str] = None,
+    response_key: Optional[str] = None,
+    stream_response: bool = False,
 ) -> list[str]:
     """
     Get data from a single API endpoint and save to a local file.
@@ -71,18 +167,34 @@ def get_raw_api(  # noqa: PLR0913
     Args:
         url (str): API endpoint URL
         raw_filepath (str): File path template with {page} placeholder
-        headers (Union[None, dict]): Request headers
-        params (Union[None, dict]): Request parameters
+        headers (Optional[dict]): Request headers
+        params (Optional[dict]): Request parameters
         raw_filetype (str): File type for response (json, csv, etc.)
-        response_key (Union[None, str]): If set, extracts data[response_key] before saving
+        response_key (Optional[str]): If set, extracts data[response_key] before saving
+        stream_response (bool): If True, saves the response with download_api_data. The body
+            is streamed to the file only when response_key is None. With response_key, the
+            body is still fully buffered and parsed once with orjson
 
     Returns:
         list[str]: List with the path where data was saved
     """
+    filepath = raw_filepath.format(page=0)
+
+    if stream_response:
+        if response_key is not None and raw_filetype != "json":
+            raise ValueError("response_key can only be used with json responses")
+        download_api_data(
+            url=url,
+            filepath=filepath,
+            headers=headers,
+            params=params,
+            response_key=response_key,
+        )
+        return [filepath]
+
     data = get_api_data(url=url, headers=headers, params=params, raw_filetype=raw_filetype)
     if response_key is not None:
         data = data[response_key]
-    filepath = raw_filepath.format(page=0)
     save_local_file(filepath=filepath, filetype=raw_filetype, data=data)
     return [filepath]
 
@@ -94,8 +206,8 @@ def get_raw_api_paginated(  # noqa: PLR0913
     page_size_param_name: str,
     page_size: int,
     params: dict,
-    headers: Union[None, dict] = None,
-    response_key: Union[None, str] = None,
+    headers: Optional[dict] = None,
+    response_key: Optional[str] = None,
     first_page: int = 0,
 ) -> list[str]:
     """Get data from a page-number paginated API and save each page locally.
@@ -106,9 +218,9 @@ def get_raw_api_paginated(  # noqa: PLR0913
         page_param_name (str): Name of the page-number query parameter.
         page_size_param_name (str): Name of the page-size query parameter.
         page_size (int): Maximum number of records requested per page.
-        headers (Union[None, dict]): Request headers.
+        headers (Optional[dict]): Request headers.
         params (dict): Additional request parameters.
-        response_key (Union[None, str]): Key containing the records when the response is an object.
+        response_key (Optional[str]): Key containing the records when the response is an object.
         first_page (int): First page number accepted by the API. Defaults to 0.
 
     Returns:
@@ -159,9 +271,9 @@ def get_raw_api_paginated(  # noqa: PLR0913
 def get_raw_api_list(
     url: Union[str, list[str]],
     raw_filepath: str,
-    params_list: Union[None, list[dict]] = None,
-    headers: Union[None, dict] = None,
-    timeout: Union[None, int] = constants.MAX_TIMEOUT_SECONDS,
+    params_list: Optional[list[dict]] = None,
+    headers: Optional[dict] = None,
+    timeout: Optional[int] = constants.MAX_TIMEOUT_SECONDS,
 ) -> list[str]:
     """
     Get data from API by aggregating multiple calls and save to a local file.
@@ -170,32 +282,192 @@ def get_raw_api_list(
         url (str or list[str]): API endpoint URL(s)
         raw_filepath (str): File path template with {page} placeholder
         params_list (list[dict]): List of parameter dicts for multiple requests
-        headers (Union[None, dict]): Request headers
-        timeout (Union[None, int]): Request timeout in seconds. Defaults to MAX_TIMEOUT_SECONDS.
+        headers (Optional[dict]): Request headers
+        timeout (Optional[int]): Request timeout in seconds. Defaults to MAX_TIMEOUT_SECONDS.
 
     Returns:
         list[str]: List with the path where data was saved
     """
     data = []
+    for request_url, params in _get_api_list_requests(url=url, params_list=params_list):
+        page_data = get_api_data(
+            url=request_url, headers=headers, params=params, raw_filetype="json", timeout=timeout
+        )
+        data += page_data
+
+    filepath = raw_filepath.format(page=0)
+    save_local_file(filepath=filepath, filetype="json", data=data)
+    return [filepath]
+
+
+def _get_api_list_requests(
+    url: Union[str, list[str]],
+    params_list: Optional[list[dict]],
+) -> list[tuple[str, Optional[dict]]]:
+    """
+    Build the (url, params) pairs requested by get_raw_api_list.
+
+    Args:
+        url (str or list[str]): API endpoint URL(s)
+        params_list (list[dict]): List of parameter dicts for multiple requests
+
+    Returns:
+        list[tuple[str, Optional[dict]]]: URL and parameters of each request, in order
+    """
     if isinstance(url, list):
-        for single_url in url:
-            page_data = get_api_data(
-                url=single_url, headers=headers, raw_filetype="json", timeout=timeout
-            )
-            data += page_data
-    else:
-        if params_list is None:
-            raise ValueError(
-                "When 'url' is a string, 'params_list' must be provided. "
-                "For a single API call without parameters, use 'get_raw_api'."
-            )
+        return [(single_url, None) for single_url in url]
+
+    if params_list is None:
+        raise ValueError(
+            "When 'url' is a string, 'params_list' must be provided. "
+            "For a single API call without parameters, use 'get_raw_api'."
+        )
+
+    return [(url, params) for params in params_list]
+
+
+def _find_json_array_bounds(source: BinaryIO) -> tuple[int, int]:
+    """
+    Find the positions of the records of a JSON array file, reading only its edges.
+
+    Args:
+        source (BinaryIO): File containing a JSON array, opened in binary mode
+
+    Returns:
+        tuple[int, int]: Position right after the opening bracket and position of the
+            closing bracket
+    """
+    read_size = constants.HTTP_STREAM_CHUNK_SIZE
+
+    start = source.seek(0)
+    while block := source.read(read_size):
+        content = block.lstrip()
+        if content:
+            start += len(block) - len(content)
+            break
+        start += len(block)
+
+    end = source.seek(0, io.SEEK_END)
+    while end > start:
+        block_start = max(end - read_size, start)
+        source.seek(block_start)
+        content = source.read(end - block_start).rstrip()
+        if content:
+            end = block_start + len(content)
+            break
+        end = block_start
+
+    source.seek(start)
+    first_byte = source.read(1)
+    source.seek(max(end - 1, start))
+    last_byte = source.read(1)
+    if first_byte != b"[" or last_byte != b"]":
+        raise ValueError("API response must contain a list of records")
+
+    return start + 1, end - 1
 
-        for params in params_list:
-            page_data = get_api_data(
-                url=url, headers=headers, params=params, raw_filetype="json", timeout=timeout
-            )
-            data += page_data
 
+def _append_json_array(file: BinaryIO, source_filepath: Path, first_record: bool) -> bool:
+    """
+    Append the records of a JSON array file to an open JSON array, without parsing them.
+
+    The records are copied in chunks, so the source file is never fully loaded in memory.
+
+    Args:
+        file (BinaryIO): Destination file, opened in binary mode after the opening bracket
+        source_filepath (Path): File containing a JSON array
+        first_record (bool): Whether no record was written to the destination yet
+
+    Returns:
+        bool: Whether no record was written to the destination yet, after this file
+    """
+    with source_filepath.open("rb") as source:
+        start, end = _find_json_array_bounds(source=source)
+        source.seek(start)
+        remaining = end - start
+        has_records = False
+        while remaining > 0:
+            chunk = source.read(min(constants.HTTP_STREAM_CHUNK_SIZE, remaining))
+            remaining -= len(chunk)
+            if not has_records:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                if not first_record:
+                    file.write(b",")
+                has_records = True
+            file.write(chunk)
+
+    return first_record and not has_records
+
+
+def get_raw_api_list_concurrent(  # noqa: PLR0913
+    url: Union[str, list[str]],
+    raw_filepath: str,
+    params_list: Optional[list[dict]] = None,
+    headers: Optional[dict] = None,
+    timeout: Optional[int] = constants.MAX_TIMEOUT_SECONDS,
+    max_concurrent_requests: int = constants.API_MAX_CONCURRENT_REQUESTS,
+) -> list[str]:
+    """
+    Concurrent version of get_raw_api_list.
+
+    Requests run concurrently in threads over the shared HTTP session, up to
+    max_concurrent_requests at a time, and each response is streamed to a temporary file.
+    The files are then concatenated, in request order, into a single JSON array without
+    being loaded as Python objects.
+
+    Args:
+        url (str or list[str]): API endpoint URL(s)
+        raw_filepath (str): File path template with {page} placeholder
+        params_list (list[dict]): List of parameter dicts for multiple requests
+        headers (Optional[dict]): Request headers
+        timeout (Optional[int]): Request timeout in seconds. Defaults to MAX_TIMEOUT_SECONDS.
+        max_concurrent_requests (int): Maximum number of simultaneous requests.
+            Defaults to API_MAX_CONCURRENT_REQUESTS.
+
+    Returns:
+        list[str]: List with the path where data was saved
+    """
+    if max_concurrent_requests < 1:
+        raise ValueError("max_concurrent_requests must be >= 1")
+
+    requests_list = _get_api_list_requests(url=url, params_list=params_list)
     filepath = raw_filepath.format(page=0)
-    save_local_file(filepath=filepath, filetype="json", data=data)
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=Path(filepath).parent) as folder:
+        response_filepaths = [Path(folder) / f"{index}.json" for index in range(len(requests_list))]
+        with ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor:
+            futures = [
+                executor.submit(
+                    download_api_data,
+                    url=request_url,
+                    filepath=response_filepath,
+                    headers=headers,
+                    params=params,
+                    timeout=timeout,
+                )
+                for (request_url, params), response_filepath in zip(
+                    requests_list, response_filepaths, strict=True
+                )
+            ]
+            for future in futures:
+                future.result()
+
+        print(f"Saving data on local file: {filepath}")
+        tmp_filepath = Path(folder) / "data.json"
+        with tmp_filepath.open("wb") as file:
+            file.write(b"[")
+            first_record = True
+            for response_filepath in response_filepaths:
+                first_record = _append_json_array(
+                    file=file,
+                    source_filepath=response_filepath,
+                    first_record=first_record,
+                )
+            file.write(b"]")
+        shutil.move(tmp_filepath, filepath)
+
+    print("File saved!")
     return [filepath]
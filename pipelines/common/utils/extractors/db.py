@@ -1,11 +1,25 @@
 # -*- coding: utf-8 -*-
 """Module to get data from databases"""
 
+import gzip
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import text
 
-from pipelines.common.utils.database import create_database_url
-from pipelines.common.utils.fs import save_local_file
+from pipelines.common.utils.database import (
+    create_database_url,
+    get_database_semaphore,
+    get_engine,
+    get_retry_wait_seconds,
+)
+from pipelines.common.utils.fs import json_file_writer, save_local_file
 
 
 def get_db_data(  # noqa: PLR0913
@@ -16,6 +30,7 @@ def get_db_data(  # noqa: PLR0913
     password: str,
     database: str,
     max_retries: int = 10,
+    params: Optional[dict[str, Any]] = None,
 ) -> list[dict]:
     """
     Captura dados de um Banco de Dados SQL
@@ -29,6 +44,8 @@ def get_db_data(  # noqa: PLR0913
         database (str): O nome da base (schema)
         raw_filepath (str): Caminho para salvar os arquivos
         max_retries (int): Quantidades de retries para efetuar a query
+        params (Optional[dict[str, Any]]): Parâmetros da query, referenciados no
+            formato :nome_parametro
 
     Returns:
         list[dict]: Dados retornados pela consulta
@@ -40,11 +57,15 @@ def get_db_data(  # noqa: PLR0913
         password=password,
         database=database,
     )
-    connection = create_engine(url)
+    connection = get_engine(url)
     for retry in range(1, max_retries + 1):
         try:
             print(f"[ATTEMPT {retry}/{max_retries}]: {query}")
-            data = pd.read_sql(sql=query, con=connection)
+            if params is None:
+                data = pd.read_sql(sql=query, con=connection)
+            else:
+                print(f"Parâmetros: {params}")
+                data = pd.read_sql(sql=text(query), con=connection, params=params)
             data = data.to_dict(orient="records")
             for d in data:
                 for k, v in d.items():
@@ -55,6 +76,9 @@ def get_db_data(  # noqa: PLR0913
         except Exception as err:
             if retry == max_retries:
                 raise err
+            wait_seconds = get_retry_wait_seconds(retry=retry)
+            print(f"Erro na consulta: {err}. Tentando novamente em {wait_seconds}s")
+            time.sleep(wait_seconds)
 
 
 def get_raw_db(  # noqa: PLR0913
@@ -99,6 +123,350 @@ def get_raw_db(  # noqa: PLR0913
     return [filepath]
 
 
+def get_raw_db_streaming(  # noqa: PLR0913
+    query: str,
+    engine: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    raw_filepath: str,
+    max_retries: int = 10,
+    page: int = 0,
+    batch_size: int = 50_000,
+) -> list[str]:
+    """
+    Captura e salva dados de um Banco de Dados SQL em lotes
+
+    A consulta é lida com um cursor no servidor (cursor nomeado no psycopg2 e SSCursor
+    no pymysql) e cada lote é escrito diretamente no arquivo, sem manter todos os
+    dados em memória
+
+    Args:
+        query (str): o SELECT para ser executado
+        engine (str): O banco de dados (postgresql ou mysql)
+        host (str): O host do banco de dados
+        user (str): O usuário para se conectar
+        password (str): A senha do usuário
+        database (str): O nome da base (schema)
+        raw_filepath (str): Caminho para salvar os arquivos
+        max_retries (int): Quantidades de retries para efetuar a query
+        page (int): Número da página usado no caminho do arquivo
+        batch_size (int): Número de registros lidos do cursor em cada lote
+
+    Returns:
+        list[str]: Lista com o caminho onde os dados foram salvos
+    """
+    url = create_database_url(
+        engine=engine,
+        host=host,
+        user=user,
+        password=password,
+        database=database,
+    )
+    connection = get_engine(url)
+    filepath = raw_filepath.format(page=page)
+    for retry in range(1, max_retries + 1):
+        try:
+            print(f"[ATTEMPT {retry}/{max_retries}]: {query}")
+            row_count = 0
+            with (
+                connection.connect().execution_options(
+                    stream_results=True,
+                    max_row_buffer=batch_size,
+                ) as conn,
+                json_file_writer(filepath=filepath) as write,
+            ):
+                for batch in pd.read_sql(sql=query, con=conn, chunksize=batch_size):
+                    row_count += write(batch)
+                    print(f"{row_count} rows saved")
+            return [filepath]
+
+        except Exception as err:
+            if retry == max_retries:
+                raise err
+            wait_seconds = get_retry_wait_seconds(retry=retry)
+            print(f"Erro na consulta: {err}. Tentando novamente em {wait_seconds}s")
+            time.sleep(wait_seconds)
+
+
+def get_raw_db_coalesced(  # noqa: PLR0913
+    query: str,
+    engine: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    raw_filepaths: list[str],
+    windows: list[tuple[datetime, datetime]],
+    window_column: str,
+    max_retries: int = 10,
+    batch_size: int = 50_000,
+) -> list[list[str]]:
+    """
+    Captura dados de várias janelas de captura com uma única consulta e salva os registros
+    de cada janela no seu arquivo raw
+
+    Os registros são separados pelo valor da coluna `window_column`, considerando cada
+    janela como [início, fim). A consulta é lida em lotes, assim como em get_raw_db_streaming.
+    Caso algum registro tenha a coluna nula ou fique fora de todas as janelas, um erro é
+    levantado ao final da leitura
+
+    Args:
+        query (str): o SELECT para ser executado, cobrindo todas as janelas
+        engine (str): O banco de dados (postgresql ou mysql)
+        host (str): O host do banco de dados
+        user (str): O usuário para se conectar
+        password (str): A senha do usuário
+        database (str): O nome da base (schema)
+        raw_filepaths (list[str]): Caminho para salvar os arquivos de cada janela
+        windows (list[tuple[datetime, datetime]]): Início e fim de cada janela em UTC.
+            Valores da coluna sem fuso horário são considerados UTC
+        window_column (str): Coluna usada para separar os registros entre as janelas
+        max_retries (int): Quantidades de retries para efetuar a query
+        batch_size (int): Número de registros lidos do cursor em cada lote
+
+    Returns:
+        list[list[str]]: Caminhos onde os dados de cada janela foram salvos
+    """
+    url = create_database_url(
+        engine=engine,
+        host=host,
+        user=user,
+        password=password,
+        database=database,
+    )
+    connection = get_engine(url)
+    filepaths = [raw_filepath.format(page=0) for raw_filepath in raw_filepaths]
+    windows = [
+        (
+            pd.to_datetime(start, utc=True).tz_localize(None),
+            pd.to_datetime(end, utc=True).tz_localize(None),
+        )
+        for start, end in windows
+    ]
+    for retry in range(1, max_retries + 1):
+        try:
+            print(f"[ATTEMPT {retry}/{max_retries}]: {query}")
+            row_count = 0
+            unassigned_count = 0
+            with ExitStack() as stack:
+                conn = stack.enter_context(
+                    connection.connect().execution_options(
+                        stream_results=True,
+                        max_row_buffer=batch_size,
+                    )
+                )
+                writers = [
+                    stack.enter_context(json_file_writer(filepath=filepath))
+                    for filepath in filepaths
+                ]
+                for batch in pd.read_sql(sql=query, con=conn, chunksize=batch_size):
+                    values = pd.to_datetime(batch[window_column], utc=True).dt.tz_localize(None)
+                    assigned = pd.Series(False, index=batch.index)
+                    for write, (start, end) in zip(writers, windows, strict=True):
+                        in_window = (values >= start) & (values < end)
+                        assigned |= in_window
+                        row_count += write(batch[in_window])
+                    unassigned_count += int((~assigned).sum())
+                    print(f"{row_count} rows saved")
+            break
+
+        except Exception as err:
+            if retry == max_retries:
+                raise err
+            wait_seconds = get_retry_wait_seconds(retry=retry)
+            print(f"Erro na consulta: {err}. Tentando novamente em {wait_seconds}s")
+            time.sleep(wait_seconds)
+
+    # Registros com a coluna nula ou fora de todas as janelas seriam descartados
+    if unassigned_count:
+        raise ValueError(
+            f"{unassigned_count} registros não pertencem a nenhuma janela de captura "
+            f"(coluna {window_column} nula ou fora das janelas)"
+        )
+    return [[filepath] for filepath in filepaths]
+
+
+def get_raw_db_copy(  # noqa: PLR0913
+    query: str,
+    engine: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    raw_filepath: str,
+    max_retries: int = 10,
+    page: int = 0,
+    compression: Optional[str] = None,
+) -> list[str]:
+    """
+    Captura e salva dados de um Banco de Dados PostgreSQL usando COPY TO STDOUT
+
+    O resultado da consulta é escrito pelo próprio banco em CSV com cabeçalho diretamente
+    no arquivo, sem conversão para DataFrame. Os valores ficam no formato de texto do
+    PostgreSQL (ex.: datas como 2024-01-01 12:00:00), diferente da serialização em JSON
+
+    Atenção: nenhuma tabela usa este modo atualmente (nenhum source da JAE tem
+    raw_filetype="csv"), portanto ele ainda não foi validado em produção
+
+    Args:
+        query (str): o SELECT para ser executado
+        engine (str): O banco de dados (somente postgresql)
+        host (str): O host do banco de dados
+        user (str): O usuário para se conectar
+        password (str): A senha do usuário
+        database (str): O nome da base (schema)
+        raw_filepath (str): Caminho para salvar os arquivos
+        max_retries (int): Quantidades de retries para efetuar a query
+        page (int): Número da página usado no caminho do arquivo
+        compression (Optional[str]): Compressão do arquivo (gzip). Com gzip, o arquivo é
+            salvo com a extensão .gz adicionada ao raw_filepath (ex.: .csv.gz)
+
+    Returns:
+        list[str]: Lista com o caminho onde os dados foram salvos
+    """
+    if engine != "postgresql":
+        raise ValueError(f"COPY TO STDOUT não é suportado pelo banco de dados {engine}")
+    if compression not in (None, "gzip"):
+        raise ValueError(f"Compressão {compression} não suportada. Suportada apenas: gzip")
+
+    url = create_database_url(
+        engine=engine,
+        host=host,
+        user=user,
+        password=password,
+        database=database,
+    )
+    filepath = raw_filepath.format(page=page)
+    if compression == "gzip":
+        filepath += ".gz"
+    copy_query = f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH CSV HEADER"
+    print(f"Saving data on local file: {filepath}")
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+    for retry in range(1, max_retries + 1):
+        try:
+            print(f"[ATTEMPT {retry}/{max_retries}]: {copy_query}")
+            with ExitStack() as stack:
+                # O arquivo só é aberto após a conexão, para não ser criado se ela falhar
+                connection = get_engine(url).raw_connection()
+                stack.callback(connection.close)
+                cursor = stack.enter_context(connection.cursor())
+                if compression == "gzip":
+                    file = stack.enter_context(gzip.open(filepath, "wb"))
+                else:
+                    file = stack.enter_context(Path(filepath).open("wb"))
+                cursor.copy_expert(copy_query, file)
+                print(f"{cursor.rowcount} rows saved")
+            return [filepath]
+
+        except Exception as err:
+            Path(filepath).unlink(missing_ok=True)
+            if retry == max_retries:
+                raise err
+            wait_seconds = get_retry_wait_seconds(retry=retry)
+            print(f"Erro na consulta: {err}. Tentando novamente em {wait_seconds}s")
+            time.sleep(wait_seconds)
+
+
+def get_raw_db_slices(  # noqa: PLR0913
+    queries: list[str],
+    engine: str,
+    host: str,
+    user: str,
+    password: str,
+    database: str,
+    raw_filepath: str,
+    max_concurrent_queries: int,
+    max_retries: int = 10,
+    get_raw_function: Callable[..., list[str]] = get_raw_db_streaming,
+) -> list[str]:
+    """
+    Captura e salva dados de um Banco de Dados SQL executando as consultas de cada fatia
+    da janela de captura de forma concorrente
+
+    O resultado de cada consulta é salvo como uma página do arquivo raw. O número de
+    consultas simultâneas no banco de dados é limitado por processo, inclusive entre
+    capturas diferentes
+
+    Args:
+        queries (list[str]): Os SELECTs de cada fatia
+        engine (str): O banco de dados (postgresql ou mysql)
+        host (str): O host do banco de dados
+        user (str): O usuário para se conectar
+        password (str): A senha do usuário
+        database (str): O nome da base (schema)
+        raw_filepath (str): Caminho para salvar os arquivos
+        max_concurrent_queries (int): Número máximo de consultas simultâneas no banco de dados
+        max_retries (int): Quantidades de retries para efetuar a query
+        get_raw_function (Callable[..., list[str]]): Função que captura e salva uma fatia
+            (get_raw_db_streaming ou get_raw_db_copy)
+
+    Returns:
+        list[str]: Lista com os caminhos onde os dados foram salvos
+    """
+    url = create_database_url(
+        engine=engine,
+        host=host,
+        user=user,
+        password=password,
+        database=database,
+    )
+    semaphore = get_database_semaphore(url=url, max_concurrent_queries=max_concurrent_queries)
+
+    def get_slice(page: int, query: str) -> list[str]:
+        with semaphore:
+            return get_raw_function(
+                query=query,
+                engine=engine,
+                host=host,
+                user=user,
+                password=password,
+                database=database,
+                raw_filepath=raw_filepath,
+                max_retries=max_retries,
+                page=page,
+            )
+
+    max_workers = min(len(queries), max_concurrent_queries)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(get_slice, range(len(queries)), queries)
+        return [filepath for filepaths in results for filepath in filepaths]
+
+
+def create_keyset_page_query(
+    query: str,
+    pagination_key: str,
+    page_size: int,
+    first_page: bool,
+) -> str:
+    """
+    Cria a query de uma página usando paginação por chave (keyset)
+
+    A página seguinte é filtrada pelo parâmetro :last_key, com o último valor
+    da chave retornado na página anterior
+
+    Args:
+        query (str): o SELECT para ser paginado
+        pagination_key (str): Coluna única e ordenável retornada pela query
+        page_size (int): Número máximo de registros em uma página
+        first_page (bool): Se a query é da primeira página
+
+    Returns:
+        str: query da página
+    """
+    where = "" if first_page else f"WHERE {pagination_key} > :last_key"
+    return f"""
+        SELECT
+            *
+        FROM
+            ({query}) AS keyset_page
+        {where}
+        ORDER BY {pagination_key}
+        LIMIT {page_size}
+    """
+
+
 def get_raw_db_paginated(  # noqa: PLR0913
     query: str,
     engine: str,
@@ -109,10 +477,16 @@ def get_raw_db_paginated(  # noqa: PLR0913
     page_size: int,
     raw_filepath: str,
     max_retries: int = 10,
+    pagination_key: Optional[str] = None,
 ) -> list[str]:
     """
     Captura e salva dados de um Banco de Dados SQL fazendo paginação
 
+    Por padrão as páginas são criadas com LIMIT e OFFSET. Se `pagination_key` for
+    informada, as páginas são filtradas a partir do último valor da chave
+    (WHERE chave > ultimo_valor ORDER BY chave LIMIT n), evitando que o banco
+    percorra as páginas anteriores a cada consulta
+
     Args:
         query (str): o SELECT para ser executado
         engine (str): O banco de dados (postgresql ou mysql)
@@ -123,24 +497,37 @@ def get_raw_db_paginated(  # noqa: PLR0913
         page_size (int): Número máximo de registros em uma página
         raw_filepath (int): Caminho para salvar os arquivos
         max_retries (int): Quantidades de retries para efetuar a query
+        pagination_key (Optional[str]): Coluna única e ordenável retornada pela query,
+            usada na paginação por chave
     Returns:
         list[str]: Lista com os caminhos onde os dados foram salvos
     """
-    offset = 0
-    base_query = f"{query} LIMIT {page_size}"
-    query = f"{base_query} OFFSET 0"
     page_data_len = page_size
     current_page = 0
+    last_key = None
     filepaths = []
     while page_data_len == page_size:
+        if pagination_key is None:
+            page_query = f"{query} LIMIT {page_size} OFFSET {current_page * page_size}"
+            params = None
+        else:
+            page_query = create_keyset_page_query(
+                query=query,
+                pagination_key=pagination_key,
+                page_size=page_size,
+                first_page=current_page == 0,
+            )
+            params = None if current_page == 0 else {"last_key": last_key}
+
         page_data = get_db_data(
-            query=query,
+            query=page_query,
             engine=engine,
             host=host,
             user=user,
             password=password,
             database=database,
             max_retries=max_retries,
+            params=params,
         )
         filepath = raw_filepath.format(page=current_page)
         save_local_file(filepath=filepath, filetype="json", data=page_data)
@@ -152,8 +539,8 @@ def get_raw_db_paginated(  # noqa: PLR0913
             Current page: {current_page}
             Current page returned {page_data_len} rows"""
         )
+        if page_data_len > 0 and pagination_key is not None:
+            last_key = page_data[-1][pagination_key]
         current_page += 1
-        offset = current_page * page_size
-        query = f"{base_query} OFFSET {offset}"
 
     return filepaths
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
+import codecs
 import io
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from ftplib import FTP
-from typing import Union
+from pathlib import Path
+from typing import Optional, Union
 
-from pipelines.common.utils.fs import save_local_file
+from pipelines.common import constants
 from pipelines.common.utils.ftp import ImplicitFtpTls, connect_ftp
 
 # from pipelines.common import constants as smtr_constants
@@ -32,6 +36,47 @@ def get_ftp_data(
     return buffer.read().decode(encoding)
 
 
+def download_ftp_file(
+    ftp_client: Union[ImplicitFtpTls, FTP],
+    ftp_filepath: str,
+    filepath: str,
+    encoding: str,
+):
+    """
+    Baixa um arquivo do FTP direto para o disco, convertendo o conteúdo para UTF-8.
+
+    O arquivo é lido em blocos e cada bloco é decodificado e gravado assim que chega,
+    sem manter o conteúdo inteiro em memória.
+
+    Args:
+        ftp_client (Union[ImplicitFtpTls, FTP]): Cliente FTP já conectado.
+        ftp_filepath (str): Caminho do arquivo no servidor FTP.
+        filepath (str): Caminho do arquivo local.
+        encoding (str): Encoding utilizado para decodificar o conteúdo.
+    """
+    print(f"Saving data on local file: {filepath}")
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        with Path(filepath).open("wb") as file:
+
+            def write(chunk: bytes):
+                file.write(decoder.decode(chunk).encode("utf-8"))
+
+            ftp_client.retrbinary(
+                "RETR " + ftp_filepath,
+                write,
+                blocksize=constants.FTP_DOWNLOAD_BLOCK_SIZE,
+            )
+            file.write(decoder.decode(b"", final=True).encode("utf-8"))
+    except Exception:
+        Path(filepath).unlink(missing_ok=True)
+        raise
+
+    print("File saved!")
+
+
 def get_raw_ftp(  # noqa: PLR0913
     host: str,
     port: int,
@@ -41,9 +86,15 @@ def get_raw_ftp(  # noqa: PLR0913
     raw_filetype: str,
     raw_filepath: str,
     encoding: str,
+    max_concurrent_downloads: int = 1,
+    ftp_client: Optional[Union[ImplicitFtpTls, FTP]] = None,
 ) -> list[str]:
     """
     Baixa múltiplos arquivos de um servidor FTP e salva localmente.
+
+    Com max_concurrent_downloads maior que 1, os arquivos são baixados em paralelo,
+    cada download em uma das conexões de um pool com até esse número de conexões.
+
     Args:
         host (str): Endereço do servidor FTP.
         port (int): Porta do servidor FTP.
@@ -54,33 +105,61 @@ def get_raw_ftp(  # noqa: PLR0913
         raw_filepath (str): Template do caminho local com placeholder
             `{page}` para indexação.
         encoding (str): Encoding utilizado para decodificar os arquivos.
+        max_concurrent_downloads (int): Número máximo de conexões simultâneas.
+            Por padrão, os arquivos são baixados um a um em uma única conexão.
+        ftp_client (Optional[Union[ImplicitFtpTls, FTP]]): Cliente FTP já conectado, usado
+            como uma das conexões do download. Não é encerrado ao final.
 
     Returns:
         list[str]: Lista com os caminhos dos arquivos salvos localmente.
     """
-    filepaths = []
-
-    ftp_client = connect_ftp(
-        host=host,
-        port=port,
-        username=username,
-        password=password,
-    )
-    try:
-        page = 0
-        for path in ftp_filepaths:
-            filepath = raw_filepath.format(page=page)
-            page_data = get_ftp_data(
-                ftp_client=ftp_client,
-                ftp_filepath=path,
-                encoding=encoding,
-            )
+    if raw_filetype not in ("json", "csv", "txt"):
+        raise NotImplementedError(
+            "Unsupported raw file extension. Supported only: json, csv and txt"
+        )
+    if max_concurrent_downloads < 1:
+        raise ValueError("max_concurrent_downloads must be >= 1")
+
+    filepaths = [raw_filepath.format(page=page) for page in range(len(ftp_filepaths))]
+    pending = queue.Queue()
+    for ftp_filepath, filepath in zip(ftp_filepaths, filepaths, strict=True):
+        pending.put((ftp_filepath, filepath))
+
+    def download_pending(connected_client: Optional[Union[ImplicitFtpTls, FTP]] = None):
+        client = connected_client or connect_ftp(
+            host=host,
+            port=port,
+            username=username,
+            password=password,
+        )
+        try:
+            while True:
+                try:
+                    ftp_filepath, filepath = pending.get_nowait()
+                except queue.Empty:
+                    return
+                download_ftp_file(
+                    ftp_client=client,
+                    ftp_filepath=ftp_filepath,
+                    filepath=filepath,
+                    encoding=encoding,
+                )
+        finally:
+            if connected_client is None:
+                client.quit()
 
-            save_local_file(filepath=filepath, filetype=raw_filetype, data=page_data)
-            page += 1
-            filepaths.append(filepath)
+    connections = min(max_concurrent_downloads, len(ftp_filepaths))
+    if connections <= 1:
+        if ftp_filepaths:
+            download_pending(connected_client=ftp_client)
+        return filepaths
 
-    finally:
-        ftp_client.quit()
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        futures = [
+            executor.submit(download_pending, ftp_client if worker == 0 else None)
+            for worker in range(connections)
+        ]
+        for future in futures:
+            future.result()
 
     return filepaths
@@ -1,17 +1,29 @@
 # -*- coding: utf-8 -*-
 """Module to deal with the filesystem"""
 
+import codecs
+import io
 import json
 import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from importlib.resources import files
 from pathlib import Path
-from typing import Optional, Union
+from typing import BinaryIO, Optional, Union
 
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from pipelines import common
-from pipelines.common.utils.utils import custom_serialization, is_running_locally
+from pipelines.common.utils.utils import (
+    custom_serialization,
+    is_running_locally,
+    serialize_datetime_columns,
+)
 
 
 def get_project_root_path() -> Path:
@@ -43,12 +55,15 @@ def get_data_folder_path() -> str:
 
 
 def get_filetype(filepath: str):
-    """Retorna a extensão de um arquivo
+    """Retorna a extensão de um arquivo, desconsiderando a extensão .gz de compressão
 
     Args:
         filepath (str): caminho para o arquivo
     """
-    return Path(filepath).suffix.removeprefix(".")
+    path = Path(filepath)
+    if path.suffix == ".gz":
+        path = path.with_suffix("")
+    return path.suffix.removeprefix(".")
 
 
 def save_local_file(
@@ -63,7 +78,8 @@ def save_local_file(
     Args:
         filepath (str): Caminho para salvar o arquivo
         filetype (str): Extensão do arquivo
-        data Union[str, dict, list[dict], pd.DataFrame]: Dados que serão salvos no arquivo
+        data Union[str, dict, list[dict], pd.DataFrame]: Dados que serão salvos no arquivo.
+            DataFrames são salvos em Parquet se filetype for parquet, caso contrário em CSV
         csv_mode (str): Modo de escrita no arquivo CSV
     """
     print(f"Saving data on local file: {filepath}")
@@ -72,6 +88,12 @@ def save_local_file(
     Path(filepath).parent.mkdir(parents=True, exist_ok=True)
     print("Parent folder created!")
 
+    if isinstance(data, pd.DataFrame) and filetype == "parquet":
+        print("Received a DataFrame, saving file as Parquet")
+        with parquet_file_writer(filepath=filepath, empty_columns=list(data.columns)) as write:
+            write(data)
+        return
+
     if isinstance(data, pd.DataFrame):
         print("Received a DataFrame, saving file as CSV")
         if csv_mode == "a":
@@ -101,6 +123,132 @@ def save_local_file(
     print("File saved!")
 
 
+def save_local_file_stream(
+    filepath: str,
+    stream: BinaryIO,
+    encoding: str = "utf-8",
+    read_size: int = 1024 * 1024,
+):
+    """
+    Salva localmente o conteúdo de texto de um arquivo aberto em modo binário, em blocos
+
+    O conteúdo é decodificado com o encoding informado e salvo em UTF-8, como no
+    save_local_file, sem carregar o arquivo inteiro em memória
+
+    Args:
+        filepath (str): Caminho para salvar o arquivo
+        stream (BinaryIO): Arquivo de origem aberto em modo binário
+        encoding (str): Encoding do conteúdo de origem
+        read_size (int): Quantidade de bytes lidos da origem por vez
+    """
+    print(f"Saving data on local file: {filepath}")
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with Path(filepath).open("wb") as file:
+        while chunk := stream.read(read_size):
+            file.write(decoder.decode(chunk).encode("utf-8"))
+        file.write(decoder.decode(b"", final=True).encode("utf-8"))
+
+    print("File saved!")
+
+
+@contextmanager
+def parquet_file_writer(
+    filepath: str,
+    empty_columns: list[str],
+    compression: str = "snappy",
+) -> Iterator[Callable[[pd.DataFrame], None]]:
+    """
+    Abre um arquivo Parquet para escrita incremental de DataFrames
+
+    Todas as colunas são escritas como string, seguindo o mesmo schema das tabelas
+    externas em CSV. Todos os DataFrames escritos devem ter as mesmas colunas
+
+    Args:
+        filepath (str): Caminho para salvar o arquivo
+        empty_columns (list[str]): Colunas do arquivo caso nenhum dado seja escrito
+        compression (str): Compressão do arquivo (snappy, zstd, gzip ou none)
+
+    Returns:
+        Iterator[Callable[[pd.DataFrame], None]]: Função que escreve um DataFrame no arquivo
+    """
+    print(f"Saving data on local file: {filepath}")
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+    writer = None
+
+    def write(data: pd.DataFrame):
+        nonlocal writer
+        schema = pa.schema([(str(c), pa.string()) for c in data.columns])
+        if writer is None:
+            writer = pq.ParquetWriter(filepath, schema=schema, compression=compression)
+        elif not writer.schema.equals(schema):
+            raise ValueError(
+                f"As colunas {list(data.columns)} diferem do arquivo Parquet: {writer.schema.names}"
+            )
+        data = data.astype(str).where(data.notna(), None)
+        writer.write_table(pa.Table.from_pandas(data, schema=schema, preserve_index=False))
+
+    try:
+        yield write
+        if writer is None:
+            write(pd.DataFrame(columns=empty_columns))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    print("File saved!")
+
+
+@contextmanager
+def json_file_writer(filepath: str) -> Iterator[Callable[[pd.DataFrame], int]]:
+    """
+    Abre um arquivo JSON para escrita incremental de DataFrames
+
+    O arquivo é escrito como uma lista de registros, no mesmo formato do
+    save_local_file, sem manter todos os dados em memória
+
+    Args:
+        filepath (str): Caminho para salvar o arquivo
+
+    Returns:
+        Iterator[Callable[[pd.DataFrame], int]]: Função que escreve um DataFrame no arquivo
+            e retorna o número de registros escritos
+    """
+    print(f"Saving data on local file: {filepath}")
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+    with Path(filepath).open("wb") as file:
+        file.write(b"[")
+        first_record = True
+
+        def write(data: pd.DataFrame) -> int:
+            nonlocal first_record
+            if data.empty:
+                return 0
+            data = serialize_datetime_columns(data)
+            columns = [str(c) for c in data.columns]
+            records = [
+                dict(zip(columns, row, strict=True))
+                for row in zip(*(data[c].tolist() for c in data.columns), strict=True)
+            ]
+            content = orjson.dumps(
+                records,
+                default=custom_serialization,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+            if not first_record:
+                file.write(b",")
+            file.write(content[1:-1])
+            first_record = False
+            return len(records)
+
+        yield write
+        file.write(b"]")
+
+    print("File saved!")
+
+
 def read_raw_data(filepath: str, reader_args: Optional[dict] = None) -> pd.DataFrame:
     """
     Lê os dados de um arquivo Raw
@@ -134,6 +282,185 @@ def read_raw_data(filepath: str, reader_args: Optional[dict] = None) -> pd.DataF
     return data
 
 
+def iter_json_array_records(filepath: str, read_size: int = 1024 * 1024) -> Iterator[dict]:
+    """
+    Lê incrementalmente os registros de um arquivo JSON cujo conteúdo é uma lista,
+    sem carregar o arquivo inteiro em memória
+
+    Args:
+        filepath (str): Caminho do arquivo
+        read_size (int): Quantidade de caracteres lidos do arquivo por vez
+
+    Returns:
+        Iterator[dict]: Registros da lista
+    """
+    decoder = json.JSONDecoder()
+    with Path(filepath).open("r", encoding="utf-8") as file:
+        buffer = file.read(read_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"O arquivo {filepath} não contém uma lista JSON")
+        position = 1
+        eof = False
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\n\r,":
+                position += 1
+
+            if position < len(buffer) and buffer[position] == "]":
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+                is_complete = eof or end < len(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                is_complete = False
+
+            if not is_complete:
+                chunk = file.read(read_size)
+                eof = chunk == ""
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            position = end
+            yield record
+
+
+def _iter_raw_data_batches(
+    filepath: str,
+    batch_size: int,
+    reader_args: dict,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê os lotes de um arquivo Raw, com os tipos e colunas inferidos em cada lote
+
+    Args:
+        filepath (str): Caminho do arquivo
+        batch_size (int): Número máximo de registros por lote
+        reader_args (dict): Argumentos para passar na função
+            de leitura (pd.read_csv ou pd.read_json)
+
+    Returns:
+        Iterator[pd.DataFrame]: DataFrames com os dados de cada lote
+    """
+    filetype = get_filetype(filepath=filepath)
+
+    if filetype == "json":
+        records = []
+        for record in iter_json_array_records(filepath=filepath):
+            records.append(record)
+            if len(records) == batch_size:
+                yield pd.read_json(io.StringIO(json.dumps(records)), **reader_args)
+                records = []
+
+        if records:
+            yield pd.read_json(io.StringIO(json.dumps(records)), **reader_args)
+
+    elif filetype in ("txt", "csv"):
+        with pd.read_csv(filepath, chunksize=batch_size, **reader_args) as reader:
+            yield from reader
+    else:
+        raise NotImplementedError(
+            "Unsupported raw file extension. Supported only: json, csv and txt"
+        )
+
+
+def _get_common_dtype(dtypes: set, filetype: str) -> Union[np.dtype, str]:
+    """
+    Retorna o tipo que a leitura do arquivo inteiro inferiria para uma coluna, a partir dos
+    tipos inferidos em cada lote
+
+    Args:
+        dtypes (set): Tipos da coluna em cada lote. Lotes sem a coluna contam como float64
+        filetype (str): Extensão do arquivo (json, csv ou txt)
+
+    Returns:
+        Union[np.dtype, str]: Tipo da coluna
+    """
+    if len(dtypes) == 1:
+        return next(iter(dtypes))
+
+    # No pd.read_json, colunas booleanas com nulos são lidas como float e colunas de data
+    # com nulos continuam como datetime
+    non_float_dtypes = dtypes - {np.dtype("float64")}
+    if filetype == "json" and len(non_float_dtypes) == 1:
+        dtype = next(iter(non_float_dtypes))
+        if pd.api.types.is_bool_dtype(dtype):
+            return np.dtype("float64")
+        if pd.api.types.is_datetime64_dtype(dtype):
+            return dtype
+
+    if all(
+        isinstance(d, np.dtype)
+        and pd.api.types.is_numeric_dtype(d)
+        and not pd.api.types.is_bool_dtype(d)
+        for d in dtypes
+    ):
+        return np.result_type(*dtypes)
+
+    return "object"
+
+
+def read_raw_data_batches(
+    filepath: str,
+    batch_size: int,
+    reader_args: Optional[dict] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lê os dados de um arquivo Raw em lotes de registros
+
+    Os lotes são lidos com as mesmas funções e argumentos de `read_raw_data`. O arquivo é lido
+    duas vezes: a primeira leitura define as colunas e o tipo de cada coluna considerando
+    todos os lotes, e a segunda retorna os lotes com essas colunas e tipos. Assim, uma coluna
+    que aparece apenas em alguns lotes, ou que tem nulos apenas em alguns lotes, é
+    retornada da mesma forma em todos eles, como na leitura do arquivo inteiro.
+
+    Args:
+        filepath (str): Caminho do arquivo
+        batch_size (int): Número máximo de registros por lote
+        reader_args (dict, optional): Argumentos para passar na função
+            de leitura (pd.read_csv ou pd.read_json)
+
+    Returns:
+        Iterator[pd.DataFrame]: DataFrames com os dados de cada lote
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be greater than zero")
+
+    print(f"Reading raw data in {filepath} (batch size: {batch_size})")
+    if reader_args is None:
+        reader_args = {}
+
+    filetype = get_filetype(filepath=filepath)
+    print(f"Reading {filetype.upper()}")
+
+    column_dtypes = {}
+    batch_count = 0
+    for data in _iter_raw_data_batches(
+        filepath=filepath,
+        batch_size=batch_size,
+        reader_args=reader_args,
+    ):
+        batch_count += 1
+        for column, dtype in data.dtypes.items():
+            column_dtypes.setdefault(column, []).append(dtype)
+
+    schema = {}
+    for column, dtypes in column_dtypes.items():
+        # Colunas ausentes em algum lote são preenchidas com NaN
+        missing = [np.dtype("float64")] if len(dtypes) < batch_count else []
+        schema[column] = _get_common_dtype(dtypes=set(dtypes + missing), filetype=filetype)
+
+    for data in _iter_raw_data_batches(
+        filepath=filepath,
+        batch_size=batch_size,
+        reader_args=reader_args,
+    ):
+        yield data.reindex(columns=list(schema)).astype(schema)
+
+
 def create_partition(timestamp: datetime, partition_date_only: bool) -> str:
     """
     Cria a partição Hive de acordo com a timestamp
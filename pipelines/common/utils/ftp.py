@@ -3,6 +3,11 @@
 
 import ftplib
 import ssl
+from typing import Optional, Union
+
+from redis.exceptions import RedisError
+
+from pipelines.common.utils.redis import get_redis_client
 
 
 class ImplicitFtpTls(ftplib.FTP_TLS):
@@ -47,3 +52,94 @@ def connect_ftp(
     if secure:
         ftp_client.prot_p()
     return ftp_client
+
+
+def get_ftp_modify_time(
+    ftp_client: Union[ImplicitFtpTls, ftplib.FTP],
+    path: str,
+) -> Optional[str]:
+    """
+    Busca a data de modificação de um arquivo ou diretório no FTP com o comando MLST
+
+    Args:
+        ftp_client (Union[ImplicitFtpTls, ftplib.FTP]): cliente FTP conectado
+        path (str): caminho no servidor
+
+    Returns:
+        Optional[str]: fato "modify" (YYYYMMDDHHMMSS) ou None se o servidor não informar
+    """
+    try:
+        response = ftp_client.sendcmd(f"MLST {path}")
+    except ftplib.error_perm as err:
+        print(f"Servidor não informou a data de modificação de {path}: {err}")
+        return None
+
+    for line in response.splitlines()[1:-1]:
+        facts = line.strip().split(" ", 1)[0]
+        for fact in facts.split(";"):
+            name, _, value = fact.partition("=")
+            if name.lower() == "modify":
+                return value
+
+    return None
+
+
+def list_ftp_directory(
+    ftp_client: Union[ImplicitFtpTls, ftplib.FTP],
+    path: str,
+    redis_key: Optional[str] = None,
+    cache_ttl_seconds: Optional[int] = None,
+) -> dict[str, dict[str, Optional[str]]]:
+    """
+    Lista os arquivos de um diretório do FTP com o comando MLSD
+
+    Se redis_key for informado, a listagem é salva no Redis junto com a data de modificação
+    do diretório. Nas próximas chamadas, se a data de modificação do diretório não mudou, a
+    listagem salva é retornada sem executar o MLSD.
+
+    Args:
+        ftp_client (Union[ImplicitFtpTls, ftplib.FTP]): cliente FTP conectado
+        path (str): diretório no servidor
+        redis_key (Optional[str]): chave do Redis da listagem salva
+        cache_ttl_seconds (Optional[int]): tempo de expiração da listagem salva
+
+    Returns:
+        dict[str, dict[str, Optional[str]]]: nome do arquivo e seus fatos "modify" e "size"
+    """
+    directory_modify = None
+    snapshot = None
+    if redis_key is not None:
+        directory_modify = get_ftp_modify_time(ftp_client=ftp_client, path=path)
+
+    if directory_modify is not None:
+        try:
+            snapshot = get_redis_client().get(redis_key)
+        except RedisError as err:
+            print(f"Erro ao buscar listagem do FTP no Redis: {err}")
+
+        if snapshot is not None and snapshot["directory_modify"] == directory_modify:
+            print(f"Diretório {path} sem alteração, usando listagem salva no Redis")
+            return snapshot["files"]
+
+    print(f"Listando arquivos do diretório {path}")
+    files = {
+        filename: {"modify": facts.get("modify"), "size": facts.get("size")}
+        for filename, facts in ftp_client.mlsd(path)
+        if facts.get("type", "file") == "file"
+    }
+
+    if snapshot is not None:
+        changed_files = [f for f, info in files.items() if snapshot["files"].get(f) != info]
+        print(f"Arquivos novos ou alterados desde a última listagem: {changed_files}")
+
+    if directory_modify is not None:
+        try:
+            get_redis_client().set(
+                redis_key,
+                {"directory_modify": directory_modify, "files": files},
+                ex=cache_ttl_seconds,
+            )
+        except RedisError as err:
+            print(f"Erro ao salvar listagem do FTP no Redis: {err}")
+
+    return files
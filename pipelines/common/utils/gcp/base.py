@@ -1,13 +1,63 @@
 # -*- coding: utf-8 -*-
 """Módulo base para as demais classes do módulo GCP"""
 
+import os
+import threading
 from dataclasses import dataclass
 from typing import Union
 
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import bigquery, storage
+from requests.adapters import HTTPAdapter
 
 from pipelines.common import constants
 
+_SERVICE_MAP = {"storage": storage.Client, "bigquery": bigquery.Client}
+_CLIENTS: dict[tuple[int, str, str], Union[storage.Client, bigquery.Client]] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_gcp_client(service: str, project: str) -> Union[storage.Client, bigquery.Client]:
+    """
+    Retorna o client compartilhado do processo para um serviço e projeto, criando-o
+    na primeira chamada.
+
+    O client usa uma sessão HTTP autenticada com pool de GCP_CLIENT_POOL_SIZE conexões,
+    para que tasks concorrentes não esperem por conexões.
+
+    Args:
+        service (str): nome do serviço (storage ou bigquery)
+        project (str): projeto do GCP
+
+    Returns:
+        Union[storage.Client, bigquery.Client]: client do serviço
+    """
+    # O pid faz parte da chave para que processos filhos não reutilizem
+    # as conexões abertas pelo processo pai
+    key = (os.getpid(), service, project)
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client_class = _SERVICE_MAP[service]
+            credentials, _ = google.auth.default(scopes=client_class.SCOPE)
+            session = AuthorizedSession(credentials)
+            session.mount(
+                "https://",
+                HTTPAdapter(
+                    pool_connections=constants.GCP_CLIENT_POOL_SIZE,
+                    pool_maxsize=constants.GCP_CLIENT_POOL_SIZE,
+                ),
+            )
+            client = client_class(project=project, credentials=credentials, _http=session)
+            _CLIENTS[key] = client
+
+    return client
+
 
 @dataclass
 class GCPBase:
@@ -60,5 +110,4 @@ class GCPBase:
         Returns:
             Union[storage.Client, bigquery.Client]: client do serviço
         """
-        service_map = {"storage": storage.Client, "bigquery": bigquery.Client}
-        return service_map[service](project=constants.PROJECT_NAME[self.env])
+        return get_gcp_client(service=service, project=constants.PROJECT_NAME[self.env])
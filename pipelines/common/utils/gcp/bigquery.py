@@ -8,17 +8,117 @@ from pathlib import Path
 from typing import Callable, Optional
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
 import pandas_gbq
+import pyarrow.parquet as pq
 import yaml
-from google.api_core.exceptions import NotFound
+from google.api_core.exceptions import GoogleAPIError, NotFound
 from google.cloud import bigquery
 from google.cloud.bigquery.external_config import HivePartitioningOptions
+from redis.exceptions import RedisError
 
 from pipelines.common import constants
-from pipelines.common.utils.gcp.base import GCPBase
+from pipelines.common.utils.gcp.base import GCPBase, get_gcp_client
 from pipelines.common.utils.gcp.storage import Storage
-from pipelines.common.utils.utils import convert_timezone, cron_date_range, cron_get_last_date
+from pipelines.common.utils.redis import get_redis_client
+from pipelines.common.utils.utils import (
+    convert_timezone,
+    cron_get_last_date,
+    cron_get_missing_dates,
+)
+
+
+def _get_bigquery_metadata_key(project_id: str) -> str:
+    """
+    Gera a chave do Redis dos metadados de um projeto do BigQuery
+
+    Args:
+        project_id (str): projeto do BigQuery
+
+    Returns:
+        str: chave do Redis
+    """
+    return f"bigquery_metadata.{project_id}"
+
+
+def get_bigquery_metadata(project_id: str) -> Optional[dict[str, set[str]]]:
+    """
+    Busca os datasets de um projeto do BigQuery e as tabelas de cada dataset
+
+    Os metadados de todo o projeto são buscados com uma única consulta ao INFORMATION_SCHEMA
+    e salvos no Redis por BIGQUERY_METADATA_CACHE_TTL_SECONDS. Como o cache pode estar
+    desatualizado, a ausência de uma tabela ou dataset deve ser confirmada na API antes de
+    qualquer ação. Uma tabela ou dataset apagado continua nos metadados até o cache expirar.
+
+    Args:
+        project_id (str): projeto do BigQuery
+
+    Returns:
+        Optional[dict[str, set[str]]]: nome de cada dataset e suas tabelas ou None se não
+            for possível consultar os metadados ou o Redis
+    """
+    redis_key = _get_bigquery_metadata_key(project_id=project_id)
+    try:
+        metadata = get_redis_client().get(redis_key)
+    except RedisError as err:
+        # Sem o cache, consultar o INFORMATION_SCHEMA a cada chamada seria mais lento
+        # que consultar a API diretamente
+        print(f"Erro ao buscar metadados do BigQuery no Redis: {err}")
+        return None
+
+    if metadata is not None:
+        return metadata
+
+    information_schema = f"`{project_id}`.`{constants.BIGQUERY_METADATA_REGION}`.INFORMATION_SCHEMA"
+    query = f"""
+        SELECT
+            s.schema_name,
+            ARRAY_AGG(t.table_name IGNORE NULLS) AS table_names
+        FROM
+            {information_schema}.SCHEMATA s
+        LEFT JOIN
+            {information_schema}.TABLES t
+        ON
+            t.table_schema = s.schema_name
+        GROUP BY
+            1
+    """
+    print(f"Buscando metadados do projeto {project_id} no INFORMATION_SCHEMA")
+    try:
+        rows = get_gcp_client(service="bigquery", project=project_id).query(query).result()
+    except GoogleAPIError as err:
+        print(f"Erro ao buscar metadados do BigQuery: {err}")
+        return None
+
+    metadata = {row.schema_name: set(row.table_names) for row in rows}
+
+    try:
+        get_redis_client().set(
+            redis_key,
+            metadata,
+            ex=constants.BIGQUERY_METADATA_CACHE_TTL_SECONDS,
+        )
+    except RedisError as err:
+        print(f"Erro ao salvar metadados do BigQuery no Redis: {err}")
+
+    return metadata
+
+
+def invalidate_bigquery_metadata(project_id: str):
+    """
+    Remove do Redis os metadados salvos de um projeto do BigQuery
+
+    Deve ser chamada após criar um dataset ou tabela, para que a próxima consulta
+    aos metadados inclua o objeto criado
+
+    Args:
+        project_id (str): projeto do BigQuery
+    """
+    try:
+        get_redis_client().delete(_get_bigquery_metadata_key(project_id=project_id))
+    except RedisError as err:
+        print(f"Erro ao remover metadados do BigQuery do Redis: {err}")
 
 
 class Dataset(GCPBase):
@@ -40,29 +140,45 @@ class Dataset(GCPBase):
         )
         self.location = location
 
-    def exists(self) -> bool:
+    def exists(self, use_cache: bool = True) -> bool:
         """
         Se o Dataset existe no BigQuery
 
+        Consulta primeiro os metadados salvos no Redis e confirma na API apenas
+        se o dataset não estiver nos metadados
+
+        Args:
+            use_cache (bool): Se os metadados salvos no Redis podem ser usados. Um dataset
+                apagado pode constar como existente até o cache expirar
+
         Returns
             bool: True se já existir no BigQuery, caso contrário, False
         """
+        project_id = constants.PROJECT_NAME[self.env]
+        metadata = get_bigquery_metadata(project_id=project_id) if use_cache else None
+        if metadata is not None and self.dataset_id in metadata:
+            return True
+
         try:
             self.client("bigquery").get_dataset(self.dataset_id)
-            return True
         except NotFound:
             return False
 
+        if metadata is not None:
+            invalidate_bigquery_metadata(project_id=project_id)
+        return True
+
     def create(self):
         """
         Cria o Dataset do BigQuery
         """
-        if not self.exists():
+        if not self.exists(use_cache=False):
             dataset_full_name = f"{constants.PROJECT_NAME[self.env]}.{self.dataset_id}"
             dataset_obj = bigquery.Dataset(dataset_full_name)
             dataset_obj.location = self.location
             print(f"Creating dataset {dataset_full_name} | location: {self.location}")
             self.client("bigquery").create_dataset(dataset_obj)
+            invalidate_bigquery_metadata(project_id=constants.PROJECT_NAME[self.env])
             print("Dataset created!")
         else:
             print("Dataset already exists")
@@ -109,18 +225,34 @@ class BQTable(GCPBase):
         self.table_full_name = f"{constants.PROJECT_NAME[env]}.{self.dataset_id}.{self.table_id}"
         return self
 
-    def exists(self) -> bool:
+    def exists(self, use_cache: bool = True) -> bool:
         """
         Checagem se a tabela existe no BigQuery
 
+        Consulta primeiro os metadados salvos no Redis e confirma na API apenas
+        se a tabela não estiver nos metadados
+
+        Args:
+            use_cache (bool): Se os metadados salvos no Redis podem ser usados. Uma tabela
+                apagada pode constar como existente até o cache expirar
+
         Returns:
             bool: Se existe ou não
         """
+        project_id = constants.PROJECT_NAME[self.env]
+        metadata = get_bigquery_metadata(project_id=project_id) if use_cache else None
+        if metadata is not None and self.table_id in metadata.get(self.dataset_id, set()):
+            return True
+
         try:
-            return bool(self.client("bigquery").get_table(self.table_full_name))
+            self.client("bigquery").get_table(self.table_full_name)
         except NotFound:
             return False
 
+        if metadata is not None:
+            invalidate_bigquery_metadata(project_id=project_id)
+        return True
+
     def get_table_min_max_value(self, field_name: str, kind: str):
         """
         Busca o valor máximo ou mínimo de um campo na tabela
@@ -166,6 +298,24 @@ class SourceTable(BQTable):
             negativo, cria partição de data e de hora
         max_recaptures (int): número máximo de recapturas executadas de uma só vez
         raw_filetype (str): tipo do dado (json, csv, txt)
+        file_chunk_size (Optional[int]): número máximo de registros por página na extração
+        pagination_key (Optional[str]): coluna única e ordenável usada na paginação por chave
+            (keyset) quando file_chunk_size é definido. Se None, a paginação usa LIMIT e OFFSET
+        pretreatment_batch_size (Optional[int]): número máximo de registros lidos por vez no
+            pré-tratamento. Se definido, os arquivos raw são lidos, tratados e escritos no
+            arquivo source em lotes, mantendo o uso de memória constante. Se None, cada
+            arquivo raw é lido inteiro
+        source_filetype (str): formato dos arquivos source e da tabela externa (csv ou
+            parquet). Em Parquet, as colunas continuam do tipo string e os tipos dos dados
+            ficam no JSON da coluna content, assim como em CSV; a diferença está na
+            compressão dos arquivos. Uma tabela já existente não pode mudar de formato: a
+            captura falha antes do upload até que a tabela externa seja recriada e os arquivos
+            da pasta source convertidos
+        parquet_compression (str): compressão dos arquivos source em Parquet
+            (snappy, zstd, gzip ou none)
+        max_coalesced_timestamps (Optional[int]): número máximo de timestamps contíguas de
+            recaptura extraídas em uma única consulta. Os dados são separados localmente nos
+            arquivos raw de cada timestamp. Se None, cada timestamp é extraída separadamente
 
     """
 
@@ -185,6 +335,11 @@ class SourceTable(BQTable):
         max_recaptures: int = 60,
         raw_filetype: str = "json",
         file_chunk_size: Optional[int] = None,
+        pagination_key: Optional[str] = None,
+        pretreatment_batch_size: Optional[int] = None,
+        source_filetype: str = "csv",
+        parquet_compression: str = "snappy",
+        max_coalesced_timestamps: Optional[int] = None,
     ) -> None:
         self.source_name = source_name
         super().__init__(
@@ -204,6 +359,13 @@ class SourceTable(BQTable):
         self.pretreat_funcs = pretreat_funcs or []
         self.schedule_cron = self._get_schedule_cron()
         self.file_chunk_size = file_chunk_size
+        self.pagination_key = pagination_key
+        self.pretreatment_batch_size = pretreatment_batch_size
+        if source_filetype not in constants.SOURCE_FILETYPES:
+            raise ValueError(f"source_filetype must be csv or parquet. Received {source_filetype}")
+        self.source_filetype = source_filetype
+        self.parquet_compression = parquet_compression
+        self.max_coalesced_timestamps = max_coalesced_timestamps
 
     def _get_schedule_cron(self) -> str:
         """
@@ -240,7 +402,11 @@ class SourceTable(BQTable):
         Cria schema para os argumentos da criação de tabela externa no BQ
         """
         print("Creating table schema...")
-        columns = next(csv.reader(Path(sample_filepath).open(encoding="utf-8")))
+        if self.source_filetype == "parquet":
+            columns = pq.read_schema(sample_filepath).names
+        else:
+            with Path(sample_filepath).open(encoding="utf-8") as f:
+                columns = next(csv.reader(f))
 
         print(f"Columns: {columns}")
         schema = [
@@ -253,19 +419,24 @@ class SourceTable(BQTable):
         """
         Cria as configurações da tabela externa no BQ
         """
-        external_config = bigquery.ExternalConfig("CSV")
-        external_config.options.skip_leading_rows = 1
-        external_config.options.allow_quoted_newlines = True
+        external_config = bigquery.ExternalConfig(self.source_filetype.upper())
         external_config.autodetect = False
         external_config.schema = self._create_table_schema(sample_filepath=sample_filepath)
-        external_config.options.field_delimiter = ","
-        external_config.options.allow_jagged_rows = False
 
-        uri = f"gs://{self.bucket_name}/source/{self.dataset_id}/{self.table_id}/*"
+        if self.source_filetype == "csv":
+            external_config.options.skip_leading_rows = 1
+            external_config.options.allow_quoted_newlines = True
+            external_config.options.field_delimiter = ","
+            external_config.options.allow_jagged_rows = False
+
+        uri_prefix = f"gs://{self.bucket_name}/source/{self.dataset_id}/{self.table_id}/"
+        # Tabelas em Parquet leem apenas arquivos .parquet, ignorando arquivos CSV salvos
+        # antes da mudança de formato
+        uri = f"{uri_prefix}*.parquet" if self.source_filetype == "parquet" else f"{uri_prefix}*"
         external_config.source_uris = uri
         hive_partitioning = HivePartitioningOptions()
         hive_partitioning.mode = "AUTO"
-        hive_partitioning.source_uri_prefix = uri.replace("*", "")
+        hive_partitioning.source_uri_prefix = uri_prefix
         external_config.hive_partitioning = hive_partitioning
 
         return external_config
@@ -285,50 +456,198 @@ class SourceTable(BQTable):
             return None
         return cron_get_last_date(cron_expr=self.schedule_cron, timestamp=timestamp)
 
-    def get_uncaptured_timestamps(self, timestamp: datetime, retroactive_days: int = 2) -> list:
+    def _get_capture_manifest_key(self) -> str:
         """
-        Retorna todas as timestamps não capturadas até um datetime
+        Gera a chave do Redis do manifesto de capturas da tabela
+
+        Returns:
+            str: chave do Redis
+        """
+        return f"{self.env}.capture_manifest_{self.dataset_id}.{self.table_id}"
+
+    def _list_captured_timestamps(
+        self,
+        initial_timestamp: datetime,
+        final_timestamp: datetime,
+    ) -> list[datetime]:
+        """
+        Lista no GCS as timestamps dos arquivos source capturados entre duas datas
 
         Args:
-            timestamp (datetime): filtro limite para a busca
-            retroactive_days (int): número de dias anteriores à timestamp informada que a busca
-                irá verificar
+            initial_timestamp (datetime): data inicial da busca
+            final_timestamp (datetime): data final da busca
 
         Returns:
-            list: Lista com as timestamps não capturadas
+            list[datetime]: Lista com as timestamps capturadas
         """
-        if self.schedule_cron is None:
-            return []
-
         st = Storage(
             env=self.env,
             dataset_id=self.dataset_id,
             table_id=self.table_id,
             bucket_names=self.bucket_names,
         )
-        initial_timestamp = max(timestamp - timedelta(days=retroactive_days), self.first_timestamp)
-        full_range = cron_date_range(
-            cron_expr=self.schedule_cron,
-            start_time=initial_timestamp,
-            end_time=timestamp,
-        )
-        days_to_check = pd.date_range(initial_timestamp.date(), timestamp.date())
+        days_to_check = pd.date_range(initial_timestamp.date(), final_timestamp.date())
 
         files = []
-        file_length = 23
-        for day in days_to_check:
-            prefix = f"source/{self.dataset_id}/{self.table_id}/data={day.date().isoformat()}/"
+        filename_length = 19
+        prefixes = [
+            f"source/{self.dataset_id}/{self.table_id}/data={day.date().isoformat()}/"
+            for day in days_to_check
+        ]
+        for day_blobs in st.list_blobs(prefixes=prefixes):
+            # Arquivos CSV e Parquet são considerados para que a mudança de formato
+            # não gere recapturas
+            filenames = [b.name.split("/")[-1].rsplit(".", 1) for b in day_blobs]
             files = files + [
                 convert_timezone(
-                    datetime.strptime(b.name.split("/")[-1], "%Y-%m-%d-%H-%M-%S.csv").replace(
+                    datetime.strptime(f[0], "%Y-%m-%d-%H-%M-%S").replace(
                         tzinfo=ZoneInfo(constants.TIMEZONE)
                     )
                 )
-                for b in st.bucket.list_blobs(prefix=prefix)
-                if ".csv" in b.name and len(b.name.split("/")[-1]) == file_length
+                for f in filenames
+                if f[-1] in constants.SOURCE_FILETYPES and len(f[0]) == filename_length
             ]
 
-        return [d for d in full_range if d not in files][: self.max_recaptures]
+        return files
+
+    def get_manifest_captured_timestamps(
+        self,
+        initial_timestamp: datetime,
+        final_timestamp: datetime,
+    ) -> Optional[np.ndarray]:
+        """
+        Busca no manifesto de capturas do Redis as timestamps capturadas entre duas datas
+
+        Args:
+            initial_timestamp (datetime): data inicial da busca
+            final_timestamp (datetime): data final da busca
+
+        Returns:
+            Optional[np.ndarray]: Array datetime64[s] (UTC) com as timestamps capturadas ou
+                None caso o manifesto não cubra todo o período
+        """
+        redis_key = self._get_capture_manifest_key()
+        redis_client = get_redis_client()
+        manifest_start = redis_client.get(f"{redis_key}_inicio")
+        if manifest_start is None or manifest_start > initial_timestamp:
+            return None
+
+        captured = redis_client.zrangebyscore(
+            redis_key,
+            initial_timestamp.timestamp(),
+            final_timestamp.timestamp(),
+            withscores=True,
+        )
+        return np.array([score for _, score in captured], dtype=np.int64).astype("datetime64[s]")
+
+    def add_to_capture_manifest(
+        self,
+        timestamps: list[datetime],
+        manifest_start: Optional[datetime] = None,
+    ):
+        """
+        Adiciona timestamps capturadas no manifesto de capturas do Redis
+
+        Timestamps anteriores a CAPTURE_MANIFEST_RETENTION_DAYS dias são removidas do manifesto
+
+        Args:
+            timestamps (list[datetime]): timestamps capturadas
+            manifest_start (Optional[datetime]): data a partir da qual o manifesto contém
+                todas as capturas da tabela
+        """
+        redis_key = self._get_capture_manifest_key()
+        redis_client = get_redis_client()
+        retention_start = datetime.now(tz=ZoneInfo(constants.TIMEZONE)) - timedelta(
+            days=constants.CAPTURE_MANIFEST_RETENTION_DAYS
+        )
+        timestamps = [t for t in timestamps if t >= retention_start]
+        if timestamps:
+            redis_client.zadd(redis_key, {t.isoformat(): t.timestamp() for t in timestamps})
+        redis_client.zremrangebyscore(redis_key, "-inf", f"({retention_start.timestamp()}")
+
+        current_start = redis_client.get(f"{redis_key}_inicio")
+        new_start = current_start
+        if manifest_start is not None and (new_start is None or manifest_start < new_start):
+            new_start = manifest_start
+        # Após a remoção, o manifesto só está completo a partir do início da retenção
+        if new_start is not None:
+            new_start = max(new_start, retention_start)
+        if new_start != current_start:
+            redis_client.set(f"{redis_key}_inicio", new_start)
+
+    def get_uncaptured_timestamps(self, timestamp: datetime, retroactive_days: int = 2) -> list:
+        """
+        Retorna todas as timestamps não capturadas até um datetime
+
+        As timestamps capturadas são lidas do manifesto de capturas do Redis. Caso o manifesto
+        não cubra o período, os arquivos são listados no GCS e o manifesto é preenchido. Caso o
+        manifesto tenha lacunas, apenas os dias a partir da primeira lacuna são listados.
+
+        Args:
+            timestamp (datetime): filtro limite para a busca
+            retroactive_days (int): número de dias anteriores à timestamp informada que a busca
+                irá verificar
+
+        Returns:
+            list: Lista com as timestamps não capturadas
+        """
+        if self.schedule_cron is None:
+            return []
+
+        initial_timestamp = max(timestamp - timedelta(days=retroactive_days), self.first_timestamp)
+
+        try:
+            captured = self.get_manifest_captured_timestamps(
+                initial_timestamp=initial_timestamp,
+                final_timestamp=timestamp,
+            )
+        except RedisError as e:
+            print(f"Erro ao ler manifesto de capturas: {e}")
+            captured = None
+
+        if captured is None:
+            print("Manifesto de capturas não encontrado, listando arquivos no GCS")
+            manifest_start = initial_timestamp
+            captured = np.array([], dtype="datetime64[s]")
+            list_start = initial_timestamp
+        else:
+            manifest_start = None
+            uncaptured = cron_get_missing_dates(
+                cron_expr=self.schedule_cron,
+                start_time=initial_timestamp,
+                end_time=timestamp,
+                dates=captured,
+            )
+            if not uncaptured:
+                return []
+            # Confere no GCS a partir da primeira lacuna, para o caso de capturas
+            # que não foram registradas no manifesto. Lacunas anteriores a
+            # CAPTURE_MANIFEST_MAX_RELIST_DAYS dias não são listadas novamente e ficam
+            # para a recaptura, que as registra no manifesto
+            list_start = max(
+                uncaptured[0],
+                timestamp - timedelta(days=constants.CAPTURE_MANIFEST_MAX_RELIST_DAYS),
+            )
+
+        files = self._list_captured_timestamps(
+            initial_timestamp=list_start,
+            final_timestamp=timestamp,
+        )
+        try:
+            self.add_to_capture_manifest(timestamps=files, manifest_start=manifest_start)
+        except RedisError as e:
+            print(f"Erro ao salvar manifesto de capturas: {e}")
+
+        captured = np.concatenate(
+            [captured, np.array([int(f.timestamp()) for f in files], dtype="datetime64[s]")]
+        )
+
+        return cron_get_missing_dates(
+            cron_expr=self.schedule_cron,
+            start_time=initial_timestamp,
+            end_time=timestamp,
+            dates=captured,
+        )[: self.max_recaptures]
 
     def upload_raw_file(self, raw_filepath: str, partition: str, if_exists: str = "replace"):
         """
@@ -354,6 +673,51 @@ class SourceTable(BQTable):
             if_exists=if_exists,
         )
 
+    def upload_raw_files(
+        self,
+        raw_filepaths: list[str],
+        partition: str,
+        if_exists: str = "replace",
+    ):
+        """
+        Faz upload de vários arquivos raw para GCS em paralelo
+
+        Args:
+            raw_filepaths (list[str]): Caminhos dos dados locais
+            partition (str): Partição Hive
+            if_exists (str): Ação a ser tomada caso o arquivo exista
+                no storage (raise, pass, replace)
+        """
+        st_obj = Storage(
+            env=self.env,
+            dataset_id=self.dataset_id,
+            table_id=self.table_id,
+            bucket_names=self.bucket_names,
+        )
+
+        st_obj.upload_files(
+            mode="raw",
+            filepaths=raw_filepaths,
+            partition=partition,
+            if_exists=if_exists,
+        )
+
+    def check_source_filetype(self):
+        """
+        Checa se a tabela externa existente foi criada no formato definido em source_filetype
+
+        Raises:
+            ValueError: Se a tabela externa usa um formato diferente de source_filetype
+        """
+        table = self.client("bigquery").get_table(self.table_full_name)
+        table_filetype = table.external_data_configuration.source_format.lower()
+        if table_filetype != self.source_filetype:
+            raise ValueError(
+                f"A tabela externa {self.table_full_name} está em {table_filetype} e o source "
+                f"está configurado para {self.source_filetype}. Recrie a tabela e converta os "
+                "arquivos da pasta source antes de mudar o formato"
+            )
+
     def create(self, sample_filepath: str, location: str = "US"):
         """
         Cria tabela externa do BQ
@@ -375,6 +739,7 @@ class SourceTable(BQTable):
         )
 
         client.create_table(bq_table)
+        invalidate_bigquery_metadata(project_id=constants.PROJECT_NAME[self.env])
         print("Table created!")
 
     def append(self, source_filepath: str, partition: str, if_exists: str = "replace"):
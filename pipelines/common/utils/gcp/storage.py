@@ -1,18 +1,175 @@
 # -*- coding: utf-8 -*-
 """Módulo com classe para interagir com o GCS"""
 
+import base64
+import hashlib
 import io
+import math
 import zipfile
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from mimetypes import MimeTypes
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
+import google_crc32c
+from google.api_core.exceptions import PreconditionFailed
 from google.cloud import storage
 from google.cloud.storage.blob import Blob
+from google.cloud.storage.retry import DEFAULT_RETRY
 
+from pipelines.common import constants
 from pipelines.common.utils.gcp.base import GCPBase
 
 
+def run_concurrently(operations: list[Callable[[], Any]], max_workers: int) -> list[Any]:
+    """
+    Executa operações do Storage em paralelo, com no máximo max_workers ao mesmo tempo
+
+    Args:
+        operations (list[Callable[[], Any]]): funções sem argumentos a serem executadas
+        max_workers (int): número máximo de operações simultâneas
+
+    Returns:
+        list[Any]: retorno de cada operação, na mesma ordem de operations
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
+
+    if len(operations) <= 1 or max_workers == 1:
+        return [operation() for operation in operations]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(operations))) as executor:
+        futures = [executor.submit(operation) for operation in operations]
+        return [future.result() for future in futures]
+
+
+@contextmanager
+def open_zip_blob(blob: Blob) -> Iterator[zipfile.ZipFile]:
+    """
+    Abre um blob .zip para leitura sem baixá-lo por inteiro
+
+    O blob é lido sob demanda, em blocos de GCS_STREAM_CHUNK_SIZE bytes
+
+    Args:
+        blob (Blob): blob do arquivo compactado
+
+    Returns:
+        Iterator[zipfile.ZipFile]: arquivo compactado aberto para leitura
+    """
+    with (
+        blob.open("rb", chunk_size=constants.GCS_STREAM_CHUNK_SIZE) as reader,
+        zipfile.ZipFile(reader, "r") as zipped_file,
+    ):
+        yield zipped_file
+
+
+def _get_file_crc32c(filepath: Path, start: int = 0, size: Optional[int] = None) -> str:
+    """
+    Calcula o CRC32C de um trecho de um arquivo local, no formato usado pelo GCS
+
+    Args:
+        filepath (Path): caminho do arquivo local
+        start (int): posição inicial do trecho em bytes
+        size (Optional[int]): tamanho do trecho em bytes. Se None, lê até o fim do arquivo
+
+    Returns:
+        str: CRC32C em base64
+    """
+    crc32c = google_crc32c.Checksum()
+    remaining = filepath.stat().st_size - start if size is None else size
+    with filepath.open("rb") as file:
+        file.seek(start)
+        while remaining > 0:
+            chunk = file.read(min(constants.GCS_CHECKSUM_READ_SIZE, remaining))
+            if not chunk:
+                break
+            crc32c.update(chunk)
+            remaining -= len(chunk)
+
+    return base64.b64encode(crc32c.digest()).decode()
+
+
+class _FilePartReader(io.RawIOBase):
+    """
+    Leitura de um trecho de um arquivo local como se fosse um arquivo independente
+
+    Args:
+        filepath (Path): caminho do arquivo local
+        start (int): posição inicial do trecho em bytes
+        size (int): tamanho do trecho em bytes
+    """
+
+    def __init__(self, filepath: Path, start: int, size: int):
+        super().__init__()
+        self._file = filepath.open("rb")
+        self._start = start
+        self._size = size
+        self._file.seek(start)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._file.tell() - self._start
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.tell()
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._file.seek(self._start + min(max(offset, 0), self._size))
+        return self.tell()
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self._size - self.tell()
+        if size < 0 or size > remaining:
+            size = remaining
+        return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _get_composite_upload_parts(file_size: int, parts_prefix: str) -> list[dict]:
+    """
+    Divide um arquivo nas partes de um upload em partes paralelas
+
+    As partes têm no mínimo GCS_COMPOSITE_UPLOAD_MIN_PART_SIZE bytes e são no máximo
+    GCS_COMPOSE_MAX_COMPONENTS, para que sejam combinadas com um único compose
+
+    Args:
+        file_size (int): tamanho do arquivo em bytes
+        parts_prefix (str): prefixo dos blobs temporários das partes
+
+    Returns:
+        list[dict]: nome do blob, posição inicial e tamanho de cada parte
+    """
+    part_size = max(
+        constants.GCS_COMPOSITE_UPLOAD_MIN_PART_SIZE,
+        math.ceil(file_size / constants.GCS_COMPOSE_MAX_COMPONENTS),
+    )
+    part_size = (
+        math.ceil(part_size / constants.GCS_UPLOAD_CHUNK_MULTIPLE)
+        * constants.GCS_UPLOAD_CHUNK_MULTIPLE
+    )
+
+    return [
+        {
+            "name": f"{parts_prefix}{index:02d}",
+            "start": start,
+            "size": min(part_size, file_size - start),
+        }
+        for index, start in enumerate(range(0, file_size, part_size))
+    ]
+
+
 class Storage(GCPBase):
     """
     Classe para interagir com o GCS
@@ -82,18 +239,27 @@ class Storage(GCPBase):
         if mode not in accept:
             raise ValueError(f"mode must be: {', '.join(accept)}. Received {mode}")
 
-    def upload_file(
+    def upload_file(  # noqa: PLR0913
         self,
         mode: str,
         filepath: Union[str, Path],
         partition: Optional[str] = None,
         if_exists: str = "replace",
         chunk_size: Optional[int] = None,
+        skip_if_identical: bool = False,
+        composite_threshold: Optional[int] = None,
         **upload_kwargs,
     ):
         """
         Sobe um arquivo para o Storage
 
+        Nos modos pass e raise, o upload é feito com a pré-condição de que o blob não exista
+        (if_generation_match=0), sem uma consulta prévia de existência. No modo replace, o
+        arquivo é enviado diretamente.
+
+        Arquivos a partir de composite_threshold bytes são enviados em partes paralelas
+        (ver Storage._upload_composite).
+
         Args:
             mode (str): prod ou dev
             filepath (Union[str, Path]): Caminho do arquivo local
@@ -101,7 +267,12 @@ class Storage(GCPBase):
             if_exists (str): Ação a ser tomada caso o arquivo exista
                 no storage (raise, pass, replace)
             chunk_size (int): Tamanho do chunk do blob em bytes (deve ser múltiplo de 256 KB)
-            upload_kwargs: Argumentos adicionais para a função upload_from_filename
+            skip_if_identical (bool): No modo replace, compara o checksum (MD5 ou CRC32C) do
+                arquivo local com o do blob e não faz o upload se forem iguais
+            composite_threshold (Optional[int]): Tamanho mínimo do arquivo em bytes para fazer
+                o upload em partes paralelas. Se None, o arquivo é sempre enviado inteiro
+            upload_kwargs: Argumentos adicionais para a função upload_from_filename. No
+                upload em partes, apenas content_type e if_generation_match são usados
         """
         filepath = Path(filepath)
 
@@ -117,20 +288,233 @@ class Storage(GCPBase):
             filetype=filetype,
         )
 
-        blob = self.bucket.blob(blob_name, chunk_size=chunk_size)
+        if (
+            if_exists == "replace"
+            and skip_if_identical
+            and self._is_blob_identical(blob_name=blob_name, filepath=filepath)
+        ):
+            print("Blob already exists with the same content, skipping upload")
+            return
+
+        if if_exists != "replace":
+            upload_kwargs.setdefault("if_generation_match", 0)
+
+        # Sem isso, arquivos como .csv.gz seriam enviados com o content type do conteúdo
+        if MimeTypes().guess_type(filepath.name)[1] == "gzip":
+            upload_kwargs.setdefault("content_type", "application/gzip")
+
+        print(f"Uploading file {filepath} to {self.bucket.name}/{blob_name}")
+        upload_kwargs["timeout"] = upload_kwargs.get("timeout", None)
+
+        try:
+            if composite_threshold is not None and filepath.stat().st_size >= composite_threshold:
+                # Evita enviar todas as partes quando o compose falharia pela pré-condição
+                if if_exists != "replace" and self.bucket.get_blob(blob_name) is not None:
+                    raise PreconditionFailed("Blob already exists")
+
+                self._upload_composite(
+                    blob_name=blob_name,
+                    filepath=filepath,
+                    content_type=upload_kwargs.get("content_type"),
+                    if_generation_match=upload_kwargs.get("if_generation_match"),
+                )
+            else:
+                blob = self.bucket.blob(blob_name, chunk_size=chunk_size)
+                blob.upload_from_filename(str(filepath), **upload_kwargs)
+        except PreconditionFailed as err:
+            if if_exists == "pass":
+                print("Blob already exists skipping upload")
+                return
+            raise FileExistsError("Blob already exists") from err
+
+        print("File uploaded!")
+
+    def _upload_composite(
+        self,
+        blob_name: str,
+        filepath: Path,
+        content_type: Optional[str] = None,
+        if_generation_match: Optional[int] = None,
+        max_workers: int = constants.GCS_COMPOSITE_UPLOAD_MAX_WORKERS,
+    ):
+        """
+        Sobe um arquivo para o Storage em partes paralelas e as combina no blob de destino
 
-        if not blob.exists() or if_exists == "replace":
-            print(f"Uploading file {filepath} to {self.bucket.name}/{blob_name}")
-            upload_kwargs["timeout"] = upload_kwargs.get("timeout", None)
+        O arquivo é dividido em até GCS_COMPOSE_MAX_COMPONENTS partes, que são enviadas como
+        blobs temporários em GCS_COMPOSITE_UPLOAD_PREFIX e combinadas com um compose. Uma
+        nova tentativa não reenvia as partes já concluídas, identificadas pelo CRC32C. As
+        partes são apagadas após o compose. As de uploads que não são refeitos ficam no bucket
+        até serem apagadas pela regra de ciclo de vida de GCS_COMPOSITE_UPLOAD_PREFIX.
 
-            blob.upload_from_filename(str(filepath), **upload_kwargs)
-            print("File uploaded!")
+        Args:
+            blob_name (str): nome completo do blob de destino
+            filepath (Path): caminho do arquivo local
+            content_type (Optional[str]): content type do blob. Se None, é inferido pela
+                extensão do arquivo
+            if_generation_match (Optional[int]): pré-condição de geração do compose
+            max_workers (int): número máximo de partes enviadas simultaneamente
+        """
+        parts_prefix = f"{constants.GCS_COMPOSITE_UPLOAD_PREFIX}/{blob_name}/"
+        parts = _get_composite_upload_parts(
+            file_size=filepath.stat().st_size,
+            parts_prefix=parts_prefix,
+        )
 
-        elif if_exists == "pass":
-            print("Blob already exists skipping upload")
+        uploaded_parts = {
+            blob.name: blob.crc32c for blob in self.bucket.list_blobs(prefix=parts_prefix)
+        }
+
+        def upload_part(part: dict):
+            crc32c = _get_file_crc32c(filepath=filepath, start=part["start"], size=part["size"])
+            if uploaded_parts.get(part["name"]) == crc32c:
+                print(f"Part {part['name']} already uploaded, skipping")
+                return
+
+            blob = self.bucket.blob(part["name"], chunk_size=constants.GCS_STREAM_CHUNK_SIZE)
+            with _FilePartReader(filepath=filepath, start=part["start"], size=part["size"]) as f:
+                # As partes são temporárias e podem ser sobrescritas, então o upload é repetido
+                # em caso de falha mesmo sem pré-condição
+                blob.upload_from_file(
+                    f,
+                    size=part["size"],
+                    checksum="crc32c",
+                    retry=DEFAULT_RETRY,
+                    timeout=constants.MAX_TIMEOUT_SECONDS,
+                )
 
-        else:
-            raise FileExistsError("Blob already exists")
+        def delete_parts():
+            part_names = {part["name"] for part in parts} | uploaded_parts.keys()
+            run_concurrently(
+                operations=[partial(self.bucket.delete_blob, name) for name in part_names],
+                max_workers=max_workers,
+            )
+
+        print(f"Uploading {len(parts)} parts of {parts[0]['size']} bytes")
+        run_concurrently(
+            operations=[partial(upload_part, part) for part in parts],
+            max_workers=max_workers,
+        )
+
+        destination = self.bucket.blob(blob_name)
+        destination.content_type = content_type or MimeTypes().guess_type(filepath.name)[0]
+
+        try:
+            destination.compose(
+                [self.bucket.blob(part["name"]) for part in parts],
+                if_generation_match=if_generation_match,
+            )
+        except PreconditionFailed:
+            delete_parts()
+            raise
+
+        delete_parts()
+
+    def _is_blob_identical(self, blob_name: str, filepath: Path) -> bool:
+        """
+        Verifica se um blob tem o mesmo conteúdo de um arquivo local
+
+        Compara o MD5 do blob ou, se ele não tiver MD5 (ex.: objetos compostos), o CRC32C
+
+        Args:
+            blob_name (str): nome completo do blob
+            filepath (Path): caminho do arquivo local
+
+        Returns:
+            bool: True se o blob existir e tiver o mesmo checksum do arquivo
+        """
+        remote_blob = self.bucket.get_blob(blob_name=blob_name)
+        if remote_blob is None:
+            return False
+
+        md5 = hashlib.md5()
+        crc32c = google_crc32c.Checksum()
+        with filepath.open("rb") as file:
+            while chunk := file.read(constants.GCS_CHECKSUM_READ_SIZE):
+                md5.update(chunk)
+                crc32c.update(chunk)
+
+        if remote_blob.md5_hash is not None:
+            return remote_blob.md5_hash == base64.b64encode(md5.digest()).decode()
+
+        return remote_blob.crc32c == base64.b64encode(crc32c.digest()).decode()
+
+    def upload_files(
+        self,
+        mode: str,
+        filepaths: list[Union[str, Path]],
+        partition: Optional[str] = None,
+        if_exists: str = "replace",
+        max_workers: int = constants.GCS_MAX_CONCURRENT_OPERATIONS,
+        **upload_kwargs,
+    ):
+        """
+        Sobe vários arquivos para o Storage em paralelo
+
+        Arquivos a partir de composite_threshold bytes, que já são enviados em partes
+        paralelas, são enviados um de cada vez após os demais, limitando o número de uploads
+        simultâneos e a memória usada pelos buffers
+
+        Args:
+            mode (str): pasta raiz
+            filepaths (list[Union[str, Path]]): Caminhos dos arquivos locais
+            partition (str): partição no formato Hive
+            if_exists (str): Ação a ser tomada caso o arquivo exista
+                no storage (raise, pass, replace)
+            max_workers (int): Número máximo de uploads simultâneos
+            upload_kwargs: Argumentos adicionais para a função upload_file
+        """
+        composite_threshold = upload_kwargs.get("composite_threshold")
+        composite_filepaths = (
+            []
+            if composite_threshold is None
+            else [f for f in filepaths if Path(f).stat().st_size >= composite_threshold]
+        )
+        operations = [
+            partial(
+                self.upload_file,
+                mode=mode,
+                filepath=filepath,
+                partition=partition,
+                if_exists=if_exists,
+                **upload_kwargs,
+            )
+            for filepath in filepaths
+            if filepath not in composite_filepaths
+        ]
+        run_concurrently(operations=operations, max_workers=max_workers)
+
+        for filepath in composite_filepaths:
+            self.upload_file(
+                mode=mode,
+                filepath=filepath,
+                partition=partition,
+                if_exists=if_exists,
+                **upload_kwargs,
+            )
+
+    def list_blobs(
+        self,
+        prefixes: list[str],
+        max_workers: int = constants.GCS_MAX_CONCURRENT_OPERATIONS,
+    ) -> list[list[Blob]]:
+        """
+        Lista os blobs de vários prefixos do bucket em paralelo
+
+        Args:
+            prefixes (list[str]): prefixos a serem listados
+            max_workers (int): Número máximo de listagens simultâneas
+
+        Returns:
+            list[list[Blob]]: blobs de cada prefixo, na mesma ordem de prefixes
+        """
+
+        def list_prefix(prefix: str) -> list[Blob]:
+            return list(self.bucket.list_blobs(prefix=prefix))
+
+        return run_concurrently(
+            operations=[partial(list_prefix, prefix) for prefix in prefixes],
+            max_workers=max_workers,
+        )
 
     def get_blob_obj(
         self,
@@ -213,38 +597,63 @@ class Storage(GCPBase):
         )
         return self.bucket.get_blob(blob_name=blob_name).download_as_text()
 
-    def unzip_file(self, mode: str, zip_filename: str, unzip_to: str):
+    def unzip_file(
+        self,
+        mode: str,
+        zip_filename: str,
+        unzip_to: str,
+        max_workers: int = constants.GCS_MAX_CONCURRENT_OPERATIONS,
+    ):
         """
-        Faz o download de uma pasta compactada .zip no storage
-        e descompacta em outra pasta no storage
+        Descompacta uma pasta compactada .zip do storage em outra pasta no storage
+
+        O zip é lido diretamente do storage, sem ser baixado por inteiro, e cada arquivo
+        é enviado em blocos de GCS_STREAM_CHUNK_SIZE bytes.
 
         Args:
             mode (str): pasta raiz
             filename (str): nome do arquivo
             unzip_to (str): nome da pasta para salvar os arquivos
+            max_workers (int): Número máximo de uploads simultâneos
 
         """
-        data = self.get_blob_bytes(mode=mode, filename=zip_filename)
-        mime = MimeTypes()
-        with zipfile.ZipFile(io.BytesIO(data), "r") as zipped_file:
-            for name in zipped_file.namelist():
-                unzipped_data = zipped_file.read(name=name)
-
-                filename_parts = name.rsplit(".", 1)
-
-                filetype = filename_parts[1] if len(filename_parts) > 1 else None
+        zip_blob_name = self.create_blob_name(mode=mode, filename=zip_filename)
+        zip_blob = self.bucket.get_blob(blob_name=zip_blob_name)
+        if zip_blob is None:
+            raise FileNotFoundError(f"Blob {zip_blob_name} not found")
 
-                blob_name = self.create_blob_name(
-                    mode=mode,
-                    partition=unzip_to,
-                    filename=filename_parts[0],
-                    filetype=filetype,
+        mime = MimeTypes()
+        with open_zip_blob(zip_blob) as zipped_file:
+            members = [info for info in zipped_file.infolist() if not info.is_dir()]
+
+        def upload_member(info: zipfile.ZipInfo):
+            filename_parts = info.filename.rsplit(".", 1)
+
+            filetype = filename_parts[1] if len(filename_parts) > 1 else None
+
+            blob_name = self.create_blob_name(
+                mode=mode,
+                partition=unzip_to,
+                filename=filename_parts[0],
+                filetype=filetype,
+            )
+
+            # Cada upload usa um leitor próprio do zip para que os arquivos
+            # sejam lidos do storage em paralelo
+            with open_zip_blob(zip_blob) as zipped_file, zipped_file.open(info) as member:
+                self.bucket.blob(
+                    blob_name,
+                    chunk_size=constants.GCS_STREAM_CHUNK_SIZE,
+                ).upload_from_file(
+                    member,
+                    size=info.file_size,
+                    content_type=mime.guess_type(info.filename)[0],
                 )
 
-                self.bucket.blob(blob_name).upload_from_string(
-                    data=unzipped_data,
-                    content_type=mime.guess_type(name)[0],
-                )
+        run_concurrently(
+            operations=[partial(upload_member, info) for info in members],
+            max_workers=max_workers,
+        )
 
     def move_folder(
         self,
@@ -252,6 +661,7 @@ class Storage(GCPBase):
         old_mode: str,
         new_mode: str,
         partitions: Optional[Union[str, list[str]]] = None,
+        max_workers: int = constants.GCS_MAX_CONCURRENT_OPERATIONS,
     ):
         """
         Move uma pasta de um mode para outro ou de um Storage para outro
@@ -262,17 +672,22 @@ class Storage(GCPBase):
             new_mode (str): pasta raiz para onde os arquivos vão ser movidos
             partitions Union[str, list[str]]: Partição ou lista de partições em
                 formato Hive a serem movidas
+            max_workers (int): Número máximo de listagens e cópias simultâneas
         """
         partitions = (
             [partitions] if isinstance(partitions, str) or partitions is None else partitions
         )
 
-        blobs = []
+        blob_prefixes = [
+            self.create_blob_name(mode=old_mode, partition=partition) for partition in partitions
+        ]
+        listed_blobs = self.list_blobs(prefixes=blob_prefixes, max_workers=max_workers)
 
-        for partition in partitions:
-            blob_prefix = self.create_blob_name(mode=old_mode, partition=partition)
-            source_blobs = list(self.bucket.list_blobs(prefix=blob_prefix))
+        blobs = []
 
+        for partition, blob_prefix, source_blobs in zip(
+            partitions, blob_prefixes, listed_blobs, strict=True
+        ):
             blob_mapping = [
                 {
                     "source_blob": blob,
@@ -289,10 +704,18 @@ class Storage(GCPBase):
             blobs += blob_mapping
 
         if new_storage.bucket_name != self.bucket_name:
-            for blob in blobs:
+
+            def move_blob(blob: dict):
                 source_blob: storage.Blob = blob["source_blob"]
                 self.bucket.copy_blob(source_blob, new_storage.bucket, new_name=blob["new_name"])
                 source_blob.delete()
+
         else:
-            for blob in blobs:
+
+            def move_blob(blob: dict):
                 self.bucket.rename_blob(blob["source_blob"], new_name=blob["new_name"])
+
+        run_concurrently(
+            operations=[partial(move_blob, blob) for blob in blobs],
+            max_workers=max_workers,
+        )
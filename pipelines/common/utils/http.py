@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Funções para requisições HTTP com conexões compartilhadas"""
+
+import os
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pipelines.common import constants
+
+_SESSIONS: dict[int, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Retorna a sessão HTTP compartilhada do processo, criando-a na primeira chamada.
+
+    As conexões são mantidas abertas (keep-alive) em um pool por host, limitado a
+    HTTP_POOL_SIZE_PER_HOST conexões simultâneas. Requisições acima do limite
+    aguardam uma conexão livre em vez de abrir novas.
+
+    A sessão é usada por todas as fontes do processo, então não guarda cookies: os cookies
+    recebidos por uma fonte não são enviados nas requisições das demais. Cookies e
+    autenticação devem ser passados em cada requisição.
+
+    Returns:
+        requests.Session: sessão HTTP
+    """
+    # O pid faz parte da chave para que processos filhos não reutilizem
+    # as conexões abertas pelo processo pai
+    key = os.getpid()
+    session = _SESSIONS.get(key)
+    if session is not None:
+        return session
+
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = requests.Session()
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(
+                pool_connections=constants.HTTP_POOL_MAX_HOSTS,
+                pool_maxsize=constants.HTTP_POOL_SIZE_PER_HOST,
+                pool_block=True,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSIONS[key] = session
+
+    return session
+
+
+def is_retryable_response(response: requests.Response) -> bool:
+    """
+    Verifica se a resposta indica uma falha temporária do servidor
+
+    Args:
+        response (requests.Response): resposta da requisição
+
+    Returns:
+        bool: True se a requisição deve ser repetida
+    """
+    return (
+        response.status_code >= constants.HTTP_SERVER_ERROR_STATUS
+        or response.status_code == constants.HTTP_TOO_MANY_REQUESTS_STATUS
+    )
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Converte o header Retry-After (segundos ou data HTTP) em segundos de espera
+
+    Args:
+        value (Optional[str]): valor do header
+
+    Returns:
+        Optional[float]: segundos de espera ou None se o valor for inválido
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+def get_http_retry_wait_seconds(
+    retry: int,
+    response: Optional[requests.Response] = None,
+) -> float:
+    """
+    Calcula a espera antes da próxima tentativa de uma requisição HTTP
+
+    Se o servidor informar o header Retry-After, o valor é respeitado (limitado a
+    HTTP_RETRY_AFTER_MAX_SECONDS). Caso contrário, usa backoff exponencial com
+    jitter, para que requisições concorrentes não voltem ao servidor ao mesmo tempo.
+
+    Args:
+        retry (int): número da tentativa que falhou, começando em 1
+        response (Optional[requests.Response]): resposta da tentativa, se houver
+
+    Returns:
+        float: segundos de espera
+    """
+    if response is not None:
+        retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(retry_after, constants.HTTP_RETRY_AFTER_MAX_SECONDS)
+
+    backoff = min(
+        constants.HTTP_RETRY_BACKOFF_SECONDS * 2 ** (retry - 1),
+        constants.HTTP_RETRY_MAX_BACKOFF_SECONDS,
+    )
+    return backoff / 2 + random.uniform(0, backoff / 2)
@@ -3,15 +3,24 @@ from prefect import flow as prefect_flow
 from prefect import runtime
 
 from pipelines.common import constants
+from pipelines.common.utils.database import dispose_engines
 from pipelines.common.utils.discord import format_send_discord_message
 from pipelines.common.utils.secret import get_env_secret
 from pipelines.common.utils.utils import convert_timezone
 
 
+def _dispose_database_engines(flow, flow_run, state):  # noqa: ARG001
+    """Fecha as conexões com bancos de dados abertas durante a execução do flow."""
+    dispose_engines()
+
+
 def flow(*args, timeout_seconds=constants.DEFAULT_FLOW_TIMEOUT, **kwargs):
     """
-    Substitui o @flow do Prefect aplicando timeout padrão em todos os flows.
+    Substitui o @flow do Prefect aplicando timeout padrão em todos os flows e fechando
+    as conexões com bancos de dados ao final da execução.
     """
+    for hook in ("on_completion", "on_failure", "on_cancellation", "on_crashed"):
+        kwargs[hook] = [*(kwargs.get(hook) or []), _dispose_database_engines]
     return prefect_flow(*args, timeout_seconds=timeout_seconds, **kwargs)
 
 
@@ -67,10 +67,28 @@ def transform_to_nested_structure(
         pd.DataFrame: Dataframe contendo as colunas listadas nas primary keys + coluna content
     """
     content_columns = [c for c in data.columns if c not in primary_keys]
-    data["content"] = data.apply(
-        lambda row: row[content_columns].to_json(),
-        axis=1,
-    )
+    content_data = data[content_columns]
+
+    # O JSON gerado deve ser igual ao de row.to_json(), em que a linha tem o dtype comum
+    # a todas as colunas. Em DataFrames apenas numéricos esse dtype não é object
+    # (ex: int vira float), então as colunas são convertidas antes da serialização.
+    # Com dtypes extension a conversão varia por linha e a serialização é feita linha a linha
+    row_dtype = data.iloc[0].dtype if not data.empty else object
+    if not pd.api.types.is_object_dtype(row_dtype):
+        if any(pd.api.types.is_extension_array_dtype(d) for d in data.dtypes):
+            data["content"] = data.apply(
+                lambda row: row[content_columns].to_json(),
+                axis=1,
+            )
+            return data[[*primary_keys, "content"]]
+
+        content_data = content_data.astype(row_dtype)
+
+    if content_columns:
+        content = content_data.to_json(orient="records", lines=True).split("\n")
+        data["content"] = content[: len(data)]
+    else:
+        data["content"] = "{}"
     return data[[*primary_keys, "content"]]
 
 
@@ -3,11 +3,15 @@
 
 import io
 import os
+import re
 import uuid
-from datetime import date, datetime
-from typing import Any
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Optional, Union
 
 import httpx
+import numpy as np
 import pandas as pd
 import pendulum
 from croniter import croniter
@@ -48,6 +52,62 @@ def custom_serialization(obj: Any) -> Any:
     raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
 
+def _format_utc_offset(seconds: float) -> str:
+    """
+    Formata um deslocamento de UTC no mesmo formato do método isoformat (+HH:MM[:SS])
+
+    Args:
+        seconds (float): Deslocamento em segundos
+
+    Returns:
+        str: Deslocamento formatado
+    """
+    sign = "-" if seconds < 0 else "+"
+    hours, remainder = divmod(abs(int(seconds)), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    offset = f"{sign}{hours:02d}:{minutes:02d}"
+    if seconds:
+        offset += f":{seconds:02d}"
+    return offset
+
+
+def serialize_datetime_columns(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas de data e hora de um DataFrame para strings ISO 8601 de forma
+    vetorizada, com o mesmo resultado da função custom_serialization:
+    datas sem fuso horário são consideradas UTC e convertidas para o fuso horário padrão
+
+    Args:
+        data (pd.DataFrame): DataFrame a ser convertido
+
+    Returns:
+        pd.DataFrame: Cópia do DataFrame com as colunas de data e hora como string
+            e valores nulos como None
+    """
+    data = data.copy()
+    for column in data.select_dtypes(include=["datetime", "datetimetz"]).columns:
+        values = data[column]
+        if values.dt.tz is None:
+            values = values.dt.tz_localize("UTC").dt.tz_convert(constants.TIMEZONE)
+
+        local = values.dt.tz_localize(None).to_numpy()
+        utc = values.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+        offset_seconds = pd.Series((local - utc) / np.timedelta64(1, "s"), index=values.index)
+        offsets = offset_seconds.map(
+            {s: _format_utc_offset(s) for s in offset_seconds.dropna().unique()}
+        )
+
+        text = np.datetime_as_string(local, unit="us")
+        text = np.where(values.dt.microsecond.to_numpy() != 0, text, text.astype("<U19"))
+        nanoseconds = values.dt.nanosecond.to_numpy()
+        if nanoseconds.any():
+            text = np.where(nanoseconds != 0, np.datetime_as_string(local, unit="ns"), text)
+        text = pd.Series(text, index=values.index, dtype=object) + offsets
+        data[column] = text.where(values.notna(), None)
+
+    return data
+
+
 def data_info_str(data: pd.DataFrame):
     """
     Retorna as informações de um Dataframe como string
@@ -63,9 +123,148 @@ def data_info_str(data: pd.DataFrame):
     return buffer.getvalue()
 
 
-def cron_date_range(cron_expr: str, start_time: datetime, end_time: datetime) -> list[datetime]:
+def _get_fixed_utc_offset(start_time: datetime, end_time: datetime) -> Optional[int]:
     """
-    Gera um range de datetimes com base em uma expressão cron entre dois datetimes.
+    Retorna o offset UTC em segundos caso ele seja o mesmo durante todo o período.
+
+    Args:
+        start_time (datetime): Datetime de início do período
+        end_time (datetime): Datetime de fim do período
+
+    Returns:
+        Optional[int]: offset em segundos ou None caso o período não tenha timezone
+            ou tenha mudança de offset (ex.: horário de verão)
+    """
+    if start_time.tzinfo is None or end_time.tzinfo is None:
+        return None
+
+    offset = start_time.utcoffset()
+    current_seconds = start_time.timestamp()
+    end_seconds = end_time.timestamp()
+    one_day = timedelta(days=1).total_seconds()
+    while current_seconds < end_seconds:
+        current_seconds = min(current_seconds + one_day, end_seconds)
+        if datetime.fromtimestamp(current_seconds, tz=start_time.tzinfo).utcoffset() != offset:
+            return None
+
+    return int(offset.total_seconds())
+
+
+@lru_cache(maxsize=256)
+def _cron_expand(
+    cron_expr: str,
+    start_seconds: int,
+    end_seconds: int,
+    utc_offset_seconds: int,
+) -> Optional[np.ndarray]:
+    """
+    Gera as execuções de uma expressão cron entre dois instantes de forma vetorizada.
+
+    Args:
+        cron_expr (str): Expressão cron
+        start_seconds (int): Epoch de início (exclusivo)
+        end_seconds (int): Epoch de fim (inclusivo)
+        utc_offset_seconds (int): Offset UTC fixo em que a expressão é avaliada
+
+    Returns:
+        Optional[np.ndarray]: Array ordenado datetime64[s] em UTC ou None caso a expressão
+            use campos não suportados pela versão vetorizada
+    """
+    # Dias da semana do tipo "n-ésimo" (ex.: 1#2) e "último" (L) ficam com o croniter
+    if re.search(r"#|(?<![A-Z])L", cron_expr.upper()):
+        return None
+
+    fields, nth_weekdays = croniter.expand(cron_expr)
+    if nth_weekdays or len(fields) != 5:  # noqa: PLR2004
+        return None
+    if any(v != "*" and not isinstance(v, int) for field in fields for v in field):
+        return None
+
+    minute_values, hour_values, day_values, month_values, weekday_values = (
+        None if field == ["*"] else field for field in fields
+    )
+
+    minutes = np.arange(start_seconds // 60 + 1, end_seconds // 60 + 1, dtype=np.int64)
+    local_minutes = minutes + utc_offset_seconds // 60
+    local_days = local_minutes // 1440
+    mask = np.ones(len(minutes), dtype=bool)
+
+    if minute_values is not None:
+        mask &= np.isin(local_minutes % 60, minute_values)
+    if hour_values is not None:
+        mask &= np.isin(local_minutes // 60 % 24, hour_values)
+    if month_values is not None or day_values is not None:
+        dates = local_days.astype("datetime64[D]")
+        month_starts = dates.astype("datetime64[M]")
+        if month_values is not None:
+            mask &= np.isin(month_starts.astype(np.int64) % 12 + 1, month_values)
+    if day_values is not None:
+        month_days = (dates - month_starts.astype("datetime64[D]")).astype(np.int64) + 1
+        day_mask = np.isin(month_days, day_values)
+    if weekday_values is not None:
+        # 01/01/1970 foi uma quinta-feira, e no cron o domingo é 0
+        weekday_mask = np.isin((local_days + 4) % 7, weekday_values)
+
+    # Assim como no croniter, dia do mês e dia da semana são combinados com OU
+    # quando ambos são definidos
+    if day_values is not None and weekday_values is not None:
+        mask &= day_mask | weekday_mask
+    elif day_values is not None:
+        mask &= day_mask
+    elif weekday_values is not None:
+        mask &= weekday_mask
+
+    datetimes = (minutes[mask] * 60).astype("datetime64[s]")
+    datetimes.flags.writeable = False
+    return datetimes
+
+
+def cron_date_array(cron_expr: str, start_time: datetime, end_time: datetime) -> np.ndarray:
+    """
+    Gera um array datetime64[s] (UTC) com as execuções de uma expressão cron entre dois
+    datetimes. O resultado é memorizado por expressão e período.
+
+    Args:
+        cron_expr (str): Expressão cron
+        start_time (datetime): Datetime de início do range (exclusivo)
+        end_time (datetime): Datetime de fim do range (inclusivo)
+
+    Returns:
+        np.ndarray: array ordenado com o range de datetimes em UTC
+    """
+    utc_offset_seconds = _get_fixed_utc_offset(start_time=start_time, end_time=end_time)
+    datetimes = None
+    if utc_offset_seconds is not None:
+        datetimes = _cron_expand(
+            cron_expr=cron_expr,
+            start_seconds=int(start_time.timestamp() // 1),
+            end_seconds=int(end_time.timestamp() // 1),
+            utc_offset_seconds=utc_offset_seconds,
+        )
+
+    if datetimes is None:
+        datetimes = np.array(
+            [
+                int(d.timestamp())
+                for d in _cron_date_range_iterator(
+                    cron_expr=cron_expr,
+                    start_time=start_time,
+                    end_time=end_time,
+                )
+            ],
+            dtype="datetime64[s]",
+        )
+
+    return datetimes
+
+
+def _cron_date_range_iterator(
+    cron_expr: str,
+    start_time: datetime,
+    end_time: datetime,
+) -> list[datetime]:
+    """
+    Gera um range de datetimes com base em uma expressão cron iterando com o croniter.
 
     Args:
         cron_expr (str): Expressão cron
@@ -74,7 +273,6 @@ def cron_date_range(cron_expr: str, start_time: datetime, end_time: datetime) ->
 
     Returns:
         list[datetime]: lista com o range de datetimes
-
     """
     iterator = croniter(cron_expr, start_time)
     current_date = iterator.get_next(datetime)
@@ -90,6 +288,94 @@ def cron_date_range(cron_expr: str, start_time: datetime, end_time: datetime) ->
     return datetimes
 
 
+def _datetime_array_to_list(datetimes: np.ndarray, tz: Any) -> list[datetime]:
+    """
+    Converte um array datetime64[s] em UTC para uma lista de datetimes em uma timezone.
+
+    Args:
+        datetimes (np.ndarray): Array datetime64[s] em UTC
+        tz (Any): Timezone dos datetimes retornados
+
+    Returns:
+        list[datetime]: lista de datetimes
+    """
+    return [datetime.fromtimestamp(s, tz=tz) for s in datetimes.astype(np.int64).tolist()]
+
+
+def cron_date_range(cron_expr: str, start_time: datetime, end_time: datetime) -> list[datetime]:
+    """
+    Gera um range de datetimes com base em uma expressão cron entre dois datetimes.
+
+    Args:
+        cron_expr (str): Expressão cron
+        start_time (datetime): Datetime de início do range
+        end_time (datetime): Datetime de fim do range
+
+    Returns:
+        list[datetime]: lista com o range de datetimes
+
+    """
+    if start_time.tzinfo is None:
+        return _cron_date_range_iterator(
+            cron_expr=cron_expr,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+    datetimes = cron_date_array(cron_expr=cron_expr, start_time=start_time, end_time=end_time)
+    return _datetime_array_to_list(datetimes=datetimes, tz=start_time.tzinfo)
+
+
+def cron_get_missing_dates(
+    cron_expr: str,
+    start_time: datetime,
+    end_time: datetime,
+    dates: Union[Iterable[datetime], np.ndarray],
+) -> list[datetime]:
+    """
+    Retorna as execuções de uma expressão cron entre dois datetimes que não estão
+    em uma lista de datetimes.
+
+    Args:
+        cron_expr (str): Expressão cron
+        start_time (datetime): Datetime de início do range
+        end_time (datetime): Datetime de fim do range
+        dates (Union[Iterable[datetime], np.ndarray]): Datetimes existentes ou array
+            datetime64[s] em UTC
+
+    Returns:
+        list[datetime]: lista ordenada com os datetimes ausentes
+    """
+    if start_time.tzinfo is None:
+        dates = set(dates)
+        return [
+            d
+            for d in _cron_date_range_iterator(
+                cron_expr=cron_expr,
+                start_time=start_time,
+                end_time=end_time,
+            )
+            if d not in dates
+        ]
+
+    expected = cron_date_array(cron_expr=cron_expr, start_time=start_time, end_time=end_time)
+    if isinstance(dates, np.ndarray):
+        existing = np.sort(dates.astype("datetime64[s]"))
+    else:
+        existing = np.sort(
+            np.fromiter((int(d.timestamp()) for d in dates), dtype=np.int64).astype("datetime64[s]")
+        )
+
+    # Diferença entre arrays ordenados: busca a posição de cada execução esperada
+    # nos datetimes existentes e verifica se o valor encontrado é o mesmo
+    positions = np.searchsorted(existing, expected)
+    found = np.zeros(len(expected), dtype=bool)
+    in_bounds = positions < len(existing)
+    found[in_bounds] = existing[positions[in_bounds]] == expected[in_bounds]
+
+    return _datetime_array_to_list(datetimes=expected[~found], tz=start_time.tzinfo)
+
+
 def cron_get_last_date(cron_expr: str, timestamp: datetime) -> datetime:
     """
     Com base em uma expressão cron, retorna a última data até um datetime de referência
@@ -2,7 +2,7 @@
 """
 Flow de verificação da captura dos dados da Jaé
 
-Common: 2026-05-12
+Common: 2026-10-18
 """
 
 from typing import Optional
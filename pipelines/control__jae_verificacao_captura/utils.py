@@ -14,7 +14,7 @@ from pytz import timezone
 from pipelines.common import constants as smtr_constants
 from pipelines.common.capture.jae import constants as jae_constants
 from pipelines.common.capture.jae.utils import get_jae_database_settings
-from pipelines.common.utils.database import create_database_url, create_engine
+from pipelines.common.utils.database import create_database_url, get_engine
 from pipelines.common.utils.gcp.bigquery import SourceTable
 from pipelines.common.utils.secret import get_env_secret
 from pipelines.common.utils.utils import convert_timezone
@@ -253,7 +253,7 @@ def get_jae_timestamp_captura_count(
         password=credentials["password"],
         database=database,
     )
-    connection = create_engine(url)
+    connection = get_engine(url)
     capture_delay_minutes = table_capture_params.get("capture_delay_minutes", {"0": 0})
     capture_delay_timestamps = [a for a in capture_delay_minutes.keys() if a != "0"]
 